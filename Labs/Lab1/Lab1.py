@@ -1,5 +1,6 @@
-from point2d import Point2d
+from point2d import Point2d, FrozenPoint2d
 from vector2d import Vector2d
+from vector2d_array import Vector2dArray
 
 
 if __name__ == "__main__":
@@ -9,6 +10,10 @@ if __name__ == "__main__":
     print(p2)  # Point2d(800, 600)
     print(p1 == p2)  # False
 
+    visited = {FrozenPoint2d(50, 100), FrozenPoint2d(50, 100)}
+    print(len(visited))  # 1, both are the same interned instance
+    print(FrozenPoint2d.pool_info())  # {'hits': 1, 'misses': 1, 'size': 1}
+
     v1 = Vector2d(3, 4)
     v2 = Vector2d.frompoints(p1, p2)
     print(v1)  # Vector2d(3, 4)
@@ -28,4 +33,10 @@ if __name__ == "__main__":
 
     v3 = Vector2d(2, 5)
     print(v1.triple(v2, v3))  # v1 ⋅ (v2 × v3)
-    print(Vector2d.triple_product(v1, v2, v3))  # v1 ⋅ (v2 × v3)
\ No newline at end of file
+    print(Vector2d.triple_product(v1, v2, v3))  # v1 ⋅ (v2 × v3)
+
+    vectors = Vector2dArray.fromvectors([v1, v2, v3])
+    print(vectors + v1)     # Vector2dArray([Vector2d(6.0, 8.0), Vector2d(753.0, 504.0), Vector2d(5.0, 9.0)])
+    print(abs(vectors))     # lengths of all vectors in one call
+    print(vectors.dot(Vector2dArray.fromvectors([v2, v3, v1])))  # [4250.0, 4000.0, 26.0]
+    print(vectors[1])       # Vector2d(750.0, 500.0)
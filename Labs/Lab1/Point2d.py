@@ -2,10 +2,10 @@ from typing import Self
 
 WIDTH, HEIGHT = 1024, 750
 
-#TODO Try using slots
 #TODO Try using pydantic
 
 class Point2d:
+    __slots__ = ("_x", "_y") # No per-instance __dict__
     x: float
     y: float
 
@@ -13,6 +13,15 @@ class Point2d:
         self.x = x
         self.y = y
 
+    @classmethod
+    def _unchecked(cls, x: float, y: float) -> Self:
+        # Trusted construction for internal hot paths: skips the WIDTH/HEIGHT check and the property setters.
+        # Anything coming from the user must go through the normal constructor
+        point = cls.__new__(cls)
+        point._x = x
+        point._y = y
+        return point
+
     @property
     def x(self) -> float:
         return self._x    
@@ -41,3 +50,75 @@ class Point2d:
 
     def __repr__(self) -> str:
         return str(self)
+
+
+class FrozenPoint2d(Point2d):
+    # Immutable and hashable Point2d, so it can be used as a dict key or stored in a set.
+    # Integer points inside the WIDTH x HEIGHT canvas are interned: constructing the same point again returns the shared instance
+    __slots__ = ()
+    interning: bool = True
+    _pool: dict[tuple[int, int], "FrozenPoint2d"] = {}
+    hits: int = 0
+    misses: int = 0
+
+    def __new__(cls, x: float, y: float) -> Self:
+        internable = cls.interning and type(x) is int and type(y) is int
+        if internable:
+            point = cls._pool.get((x, y))
+            if point is not None:
+                cls.hits += 1
+                return point
+        point = object.__new__(cls)
+        Point2d.x.fset(point, x) # Bounds are still checked, only through the parent's setters
+        Point2d.y.fset(point, y)
+        if internable:
+            cls.misses += 1
+            cls._pool[(x, y)] = point
+        return point
+
+    def __init__(self, x: float, y: float) -> None:
+        pass # Everything is done in __new__
+
+    @classmethod
+    def _unchecked(cls, x: float, y: float) -> Self:
+        # Same as __new__ without the bounds check, the inherited version would call __new__ without coordinates
+        internable = cls.interning and type(x) is int and type(y) is int
+        if internable:
+            point = cls._pool.get((x, y))
+            if point is not None:
+                cls.hits += 1
+                return point
+        point = object.__new__(cls)
+        point._x = x
+        point._y = y
+        if internable:
+            cls.misses += 1
+            cls._pool[(x, y)] = point
+        return point
+
+    @property
+    def x(self) -> float:
+        return self._x
+
+    @property
+    def y(self) -> float:
+        return self._y
+
+    def __hash__(self) -> int:
+        return hash((self._x, self._y))
+
+    def __reduce__(self) -> tuple:
+        return (type(self), (self._x, self._y))
+
+    def __str__(self) -> str:
+        return f"FrozenPoint2d({self.x}, {self.y})"
+
+    @classmethod
+    def pool_info(cls) -> dict[str, int]:
+        return {"hits": cls.hits, "misses": cls.misses, "size": len(cls._pool)}
+
+    @classmethod
+    def clear_pool(cls) -> None:
+        cls._pool.clear()
+        cls.hits = 0
+        cls.misses = 0
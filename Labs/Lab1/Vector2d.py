@@ -3,6 +3,7 @@ import math
 from point2d import Point2d, WIDTH, HEIGHT
 
 class Vector2d:
+    __slots__ = ("_x", "_y")
     x: float
     y: float
 
@@ -10,9 +11,17 @@ class Vector2d:
         self.x = x
         self.y = y
 
+    @classmethod
+    def _unchecked(cls, x: float, y: float) -> Self:
+        # Skips the property setters, used by the operators below
+        vector = cls.__new__(cls)
+        vector._x = x
+        vector._y = y
+        return vector
+
     @classmethod
     def frompoints(cls, p1: Point2d, p2: Point2d) -> Self: #Or can be written "Vector2d"
-        return cls(p2.x - p1.x, p2.y - p1.y)
+        return cls._unchecked(p2.x - p1.x, p2.y - p1.y)
 
     @property
     def x(self) -> float:
@@ -65,36 +74,78 @@ class Vector2d:
         return str(self)
 
     def __abs__(self) -> float:
-        return math.sqrt((self.x * self.x) + (self.y * self.y)) # A bit faster, than ((self.x ** 2) + (self.y ** 2)) ** 0.5, so if you need to optimize - than use that
+        return math.sqrt((self._x * self._x) + (self._y * self._y)) # A bit faster, than ((self.x ** 2) + (self.y ** 2)) ** 0.5, so if you need to optimize - than use that
 
     def __add__(self, value: Self) -> Self:
-        return Vector2d(self.x + value.x, self.y + value.y)
+        return Vector2d._unchecked(self._x + value._x, self._y + value._y)
 
     def __sub__(self, value: Self) -> Self:
-        return Vector2d(self.x - value.x, self.y - value.y)
+        return Vector2d._unchecked(self._x - value._x, self._y - value._y)
 
     def __mul__(self, value: float) -> Self:
-        return Vector2d(self.x * value, self.y * value)
+        return Vector2d._unchecked(self._x * value, self._y * value)
 
     def __rmul__(self, value: float) -> Self:
-        return Vector2d(self.x * value, self.y * value)
+        return Vector2d._unchecked(self._x * value, self._y * value)
 
     def __truediv__(self, value: float) -> Self: #! Does it need to be floategers or float everywhere?
-        return Vector2d(self.x // value, self.y // value) 
+        return Vector2d._unchecked(self._x // value, self._y // value) 
+
+    # In-place versions mutate the vector instead of allocating a new one
+    def __iadd__(self, value: Self) -> Self:
+        self._x += value._x
+        self._y += value._y
+        return self
+
+    def __isub__(self, value: Self) -> Self:
+        self._x -= value._x
+        self._y -= value._y
+        return self
+
+    def __imul__(self, value: float) -> Self:
+        self._x *= value
+        self._y *= value
+        return self
+
+    def __itruediv__(self, value: float) -> Self: # Floor division, same as __truediv__
+        self._x //= value
+        self._y //= value
+        return self
+
+    @staticmethod
+    def axpy(a: float, x: Self, y: Self) -> Self:
+        # y += a * x without the temporary vector for a * x
+        y._x += a * x._x
+        y._y += a * x._y
+        return y
+
+    def lerp(self, other: Self, t: float) -> Self:
+        # Moves this vector towards other in place: t = 0 keeps it, t = 1 makes it equal to other
+        self._x += (other._x - self._x) * t
+        self._y += (other._y - self._y) * t
+        return self
+
+    def normalize_inplace(self) -> Self:
+        length = abs(self)
+        if length == 0:
+            raise ValueError("Zero vector can't be normalized")
+        self._x /= length
+        self._y /= length
+        return self
     
     def dot(self, other: Self) -> float:
-        return self.x * other.x + self.y * other.y
+        return self._x * other._x + self._y * other._y
     
     @staticmethod   # Can be done better with classmethod
     def dot_product(vector1: Self, vector2: Self) -> float:
-        return vector1.x * vector2.x + vector1.y * vector2.y
+        return vector1._x * vector2._x + vector1._y * vector2._y
     
     def cross(self, other: Self) -> Self:
-        return Vector2d(self.x * other.y - self.y * other.x, 0)
+        return Vector2d._unchecked(self._x * other._y - self._y * other._x, 0)
 
     @staticmethod
     def cross_product(vector1: Self, vector2: Self) -> Self:
-        return Vector2d(vector1.x * vector2.y - vector1.y * vector2.x, 0)
+        return Vector2d._unchecked(vector1._x * vector2._y - vector1._y * vector2._x, 0)
 
     def triple(self, vector2: Self, vector3: Self) -> float:
         return self.dot(Vector2d.cross(vector2, vector3))
@@ -0,0 +1,206 @@
+from time import perf_counter
+from typing import Callable
+import math, os, random, sys, tracemalloc
+from point2d import Point2d, WIDTH, HEIGHT
+from vector2d import Vector2d
+from spatial_index import QuadTree, UniformGrid
+from vector2d_array import Vector2dArray
+from pipeline import GeometryPipeline
+import kernels
+
+
+class _Point2dWithDict:
+    # Point2d as it was before __slots__: a standalone copy, since a subclass of a slotted class still carries its slots
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+    @property
+    def x(self) -> float:
+        return self._x
+
+    @x.setter
+    def x(self, x: float) -> None:
+        if not (0 <= x <= WIDTH):
+            raise ValueError("Wrong x value")
+        self._x = x
+
+    @property
+    def y(self) -> float:
+        return self._y
+
+    @y.setter
+    def y(self, y: float) -> None:
+        if not (0 <= y <= HEIGHT):
+            raise ValueError("Wrong y value")
+        self._y = y
+
+
+def _timed(build: Callable[[], list]) -> tuple[float, list]:
+    start = perf_counter()
+    items = build()
+    return perf_counter() - start, items
+
+
+def _bytes_per_item(build: Callable[[int], list], sample: int = 100_000) -> float:
+    # tracemalloc slows construction down a lot, so memory is measured on a sample
+    tracemalloc.start()
+    items = build(sample)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / sample
+
+
+def bench_instances(count: int = 10_000_000) -> None:
+    print(f"Constructing {count:,} instances")
+    cases = {
+        "Point2d with __dict__": lambda n: [_Point2dWithDict(i % 1000, i % 700) for i in range(n)],
+        "Point2d (checked)": lambda n: [Point2d(i % 1000, i % 700) for i in range(n)],
+        "Point2d._unchecked": lambda n: [Point2d._unchecked(i % 1000, i % 700) for i in range(n)],
+        "Vector2d": lambda n: [Vector2d(i, i) for i in range(n)],
+        "Vector2d._unchecked": lambda n: [Vector2d._unchecked(i, i) for i in range(n)],
+    }
+    for name, build in cases.items():
+        elapsed, items = _timed(lambda: build(count))
+        del items
+        per_item = _bytes_per_item(build)
+        print(f"{name:<24} {elapsed:8.2f} s   {count / elapsed / 1e6:6.2f} M/s   "
+              f"{per_item:6.1f} B/instance   ~{per_item * count / 2**20:8.1f} MiB total")
+
+
+def _brute_nearest(points: list[Point2d], center: Point2d, k: int) -> list[Point2d]:
+    return sorted(points, key=lambda p: (p.x - center.x) ** 2 + (p.y - center.y) ** 2)[:k]
+
+
+def _brute_radius(points: list[Point2d], center: Point2d, radius: float) -> list[Point2d]:
+    return [p for p in points if (p.x - center.x) ** 2 + (p.y - center.y) ** 2 <= radius * radius]
+
+
+def _brute_rect(points: list[Point2d], x_min: float, y_min: float, x_max: float, y_max: float) -> list[Point2d]:
+    return [p for p in points if x_min <= p.x <= x_max and y_min <= p.y <= y_max]
+
+
+def bench_spatial(*sizes: int) -> None:
+    sizes = sizes or (10**4, 10**5, 10**6, 10**7)
+    rng = random.Random(42)
+    for size in sizes:
+        points = [Point2d._unchecked(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(size)]
+        centers = [Point2d._unchecked(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(20)]
+        print(f"{size:,} points, {len(centers)} queries of each kind")
+        indexes = {}
+        for name, build in (("grid", lambda: UniformGrid.bulk_load(points)), ("quadtree", lambda: QuadTree.bulk_load(points))):
+            elapsed, indexes[name] = _timed(build)
+            print(f"  {name:<10} bulk load {elapsed:8.3f} s")
+        queries = {
+            "nearest(k=10)": (lambda c: _brute_nearest(points, c, 10), lambda index, c: index.nearest(c, 10)),
+            "within_radius(20)": (lambda c: _brute_radius(points, c, 20), lambda index, c: index.within_radius(c, 20)),
+            "within_rect(64x64)": (lambda c: _brute_rect(points, c.x - 32, c.y - 32, c.x + 32, c.y + 32),
+                                   lambda index, c: index.within_rect(c.x - 32, c.y - 32, c.x + 32, c.y + 32)),
+        }
+        for query, (brute, indexed) in queries.items():
+            brute_time, _ = _timed(lambda: [brute(c) for c in centers])
+            line = f"  {query:<20} brute force {brute_time / len(centers) * 1e3:10.3f} ms"
+            for name, index in indexes.items():
+                index_time, _ = _timed(lambda: [indexed(index, c) for c in centers])
+                line += f"   {name} {index_time / len(centers) * 1e3:8.3f} ms"
+            print(line)
+
+
+def _count_vector_allocations(run: Callable[[], None]) -> int:
+    # Every Vector2d is built either by the constructor or by _unchecked, so both are wrapped for the run
+    created = 0
+    original_init, original_unchecked = Vector2d.__init__, Vector2d.__dict__["_unchecked"]
+
+    def counting_init(self, x: float, y: float) -> None:
+        nonlocal created
+        created += 1
+        original_init(self, x, y)
+
+    def counting_unchecked(cls, x: float, y: float) -> Vector2d:
+        nonlocal created
+        created += 1
+        return original_unchecked.__func__(cls, x, y)
+
+    Vector2d.__init__ = counting_init
+    Vector2d._unchecked = classmethod(counting_unchecked)
+    try:
+        run()
+    finally:
+        Vector2d.__init__ = original_init
+        Vector2d._unchecked = original_unchecked
+    return created
+
+
+def bench_integration(steps: int = 1_000_000) -> None:
+    # Explicit Euler integration of a single particle, written with operators and with the in-place helpers
+    dt = 0.001
+    def with_operators() -> None:
+        position, velocity, acceleration = Vector2d(0, 0), Vector2d(1, 0), Vector2d(0, -9.8)
+        for _ in range(steps):
+            velocity = velocity + acceleration * dt
+            position = position + velocity * dt
+
+    def in_place() -> None:
+        position, velocity, acceleration = Vector2d(0, 0), Vector2d(1, 0), Vector2d(0, -9.8)
+        for _ in range(steps):
+            Vector2d.axpy(dt, acceleration, velocity)
+            Vector2d.axpy(dt, velocity, position)
+
+    print(f"Euler integration, {steps:,} steps")
+    for name, run in (("operators", with_operators), ("axpy in place", in_place)):
+        elapsed, _ = _timed(run)
+        allocations = _count_vector_allocations(run) - 3 # The three initial vectors
+        print(f"  {name:<14} {elapsed:8.3f} s   {allocations / steps:4.1f} Vector2d allocations per step")
+
+
+def bench_kernels(size: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    vectors = [[Vector2d(rng.uniform(-1e3, 1e3), rng.uniform(-1e3, 1e3)) for _ in range(size)] for _ in range(3)]
+    print(f"Triple/cross products over {size:,} vector triples")
+    elapsed, _ = _timed(lambda: [Vector2d.triple_product(a, b, c) for a, b, c in zip(*vectors)])
+    print(f"  {'Vector2d loop':<14} triple {elapsed:8.3f} s")
+    default = kernels.backend.name
+    for name in kernels.available_backends():
+        kernels.use_backend(name)
+        arrays = [Vector2dArray.fromvectors(column) for column in vectors]
+        triple_time, _ = _timed(lambda: Vector2dArray.triple_product(*arrays))
+        cross_time, _ = _timed(lambda: Vector2dArray.cross_product(arrays[0], arrays[1]))
+        print(f"  {name + ' backend':<14} triple {triple_time:8.3f} s   cross {cross_time:8.3f} s")
+    kernels.use_backend(default)
+    mismatches = kernels.compare_backends()
+    print(f"  Backends compared: {kernels.available_backends()}, "
+          f"{'identical results' if not mismatches else f'different results in {mismatches}'}")
+
+
+def bench_pipeline(size: int = 10_000_000, max_workers: int = 0) -> None:
+    max_workers = max_workers or os.cpu_count() or 1
+    rng = random.Random(0)
+    starts = Vector2dArray([rng.uniform(0, WIDTH) for _ in range(size)], [rng.uniform(0, HEIGHT) for _ in range(size)])
+    ends = Vector2dArray([rng.uniform(0, WIDTH) for _ in range(size)], [rng.uniform(0, HEIGHT) for _ in range(size)])
+    print(f"frompoints + total length over {size:,} point pairs ({kernels.backend.name} backend)")
+    elapsed, _ = _timed(lambda: math.fsum(abs(Vector2dArray.frompoints(starts, ends))))
+    print(f"  {'in process':<12} {elapsed:8.3f} s")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with GeometryPipeline(workers) as pipeline:
+            pipeline.total_length(Vector2dArray([0.0], [0.0])) # Start the worker processes before timing
+            elapsed, _ = _timed(lambda: pipeline.total_length(pipeline.frompoints(starts, ends)))
+        baseline = baseline or elapsed
+        print(f"  {workers:>2} workers   {elapsed:8.3f} s   speedup x{baseline / elapsed:5.2f}")
+
+
+BENCHMARKS = {
+    "instances": bench_instances,
+    "spatial": bench_spatial,
+    "integration": bench_integration,
+    "kernels": bench_kernels,
+    "pipeline": bench_pipeline,
+}
+
+
+if __name__ == "__main__":
+    # python benchmark.py [name] [sizes...]
+    name = sys.argv[1] if len(sys.argv) > 1 else "instances"
+    args = [int(arg) for arg in sys.argv[2:]]
+    BENCHMARKS[name](*args)
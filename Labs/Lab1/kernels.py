@@ -0,0 +1,162 @@
+from array import array
+from typing import Callable, Iterable, Protocol, Sequence
+import math, operator, random
+
+
+Column = Sequence[float] # numpy.ndarray of float64 for the numpy backend, array('d') for the python one
+
+
+class KernelBackendProtocol(Protocol):
+    name: str
+
+    def column(self, values: Iterable[float] = ()) -> Column:
+        ...
+    def apply(self, op: Callable[[float, float], float], a: Column, b: Column | float) -> Column:
+        ...
+    def length(self, xs: Column, ys: Column) -> Column:
+        ...
+    def dot(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        ...
+    def cross(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        ...
+    def triple(self, x1: Column, y1: Column, x2: Column, y2: Column, x3: Column, y3: Column) -> Column:
+        ...
+
+
+
+class PythonBackend(KernelBackendProtocol):
+    name = "python"
+
+    def column(self, values: Iterable[float] = ()) -> Column:
+        if isinstance(values, memoryview) and values.c_contiguous: # Shared memory, copied as raw bytes instead of float by float
+            column = array('d')
+            with values.cast('B') as raw:
+                column.frombytes(raw)
+            return column
+        return array('d', values)
+
+    def apply(self, op: Callable[[float, float], float], a: Column, b: Column | float) -> Column:
+        # Elementwise op over a column and either another column or a scalar
+        if isinstance(b, (int, float)):
+            return array('d', [op(value, b) for value in a])
+        return array('d', map(op, a, b))
+
+    def length(self, xs: Column, ys: Column) -> Column:
+        # Same formula as Vector2d.__abs__, so batch and scalar results are bit-identical
+        return array('d', [math.sqrt(x * x + y * y) for x, y in zip(xs, ys)])
+
+    def dot(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        return array('d', [a * c + b * d for a, b, c, d in zip(x1, y1, x2, y2)])
+
+    def cross(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        return array('d', [a * d - b * c for a, b, c, d in zip(x1, y1, x2, y2)])
+
+    def triple(self, x1: Column, y1: Column, x2: Column, y2: Column, x3: Column, y3: Column) -> Column:
+        # Vector2d.cross gives Vector2d(z, 0), so only x1 takes part in the dot product, y1 is multiplied by 0
+        return array('d', [a * (c * f - d * e) for a, c, d, e, f in zip(x1, x2, y2, x3, y3)])
+
+
+
+class NumpyBackend(KernelBackendProtocol):
+    name = "numpy"
+
+    def __init__(self) -> None:
+        import numpy # ImportError here means the backend is not available
+        self.np = numpy
+
+    def _as_array(self, values: Column) -> Column:
+        # Columns made by the python backend are array('d'), numpy reads them through the buffer protocol
+        return self.np.asarray(values, dtype=self.np.float64)
+
+    def column(self, values: Iterable[float] = ()) -> Column:
+        if isinstance(values, memoryview) and values.c_contiguous: # Shared memory, one copy of the whole buffer
+            return self.np.frombuffer(values, dtype=self.np.float64).copy()
+        if isinstance(values, (self.np.ndarray, array, memoryview, list, tuple)): # Strided views are read element by element
+            return self.np.array(values, dtype=self.np.float64)
+        return self.np.fromiter(values, dtype=self.np.float64)
+
+    def apply(self, op: Callable[[float, float], float], a: Column, b: Column | float) -> Column:
+        return op(self._as_array(a), b if isinstance(b, (int, float)) else self._as_array(b))
+
+    def length(self, xs: Column, ys: Column) -> Column:
+        xs, ys = self._as_array(xs), self._as_array(ys)
+        return self.np.sqrt(xs * xs + ys * ys)
+
+    def dot(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        x1, y1, x2, y2 = map(self._as_array, (x1, y1, x2, y2))
+        return x1 * x2 + y1 * y2
+
+    def cross(self, x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+        x1, y1, x2, y2 = map(self._as_array, (x1, y1, x2, y2))
+        return x1 * y2 - y1 * x2
+
+    def triple(self, x1: Column, y1: Column, x2: Column, y2: Column, x3: Column, y3: Column) -> Column:
+        x1, x2, y2, x3, y3 = map(self._as_array, (x1, x2, y2, x3, y3))
+        return x1 * (x2 * y3 - y2 * x3)
+
+
+
+BACKENDS: dict[str, type[KernelBackendProtocol]] = {
+    PythonBackend.name: PythonBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+
+def available_backends() -> list[str]:
+    names = []
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend_cls()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _default_backend() -> KernelBackendProtocol:
+    try:
+        return NumpyBackend()
+    except ImportError:
+        return PythonBackend()
+
+
+backend: KernelBackendProtocol = _default_backend() # Chosen once at import time, use_backend() switches it
+
+
+def use_backend(name: str) -> None:
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}, available: {list(BACKENDS)}")
+    backend = BACKENDS[name]()
+
+
+def dot(x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+    return backend.dot(x1, y1, x2, y2)
+
+
+def cross(x1: Column, y1: Column, x2: Column, y2: Column) -> Column:
+    return backend.cross(x1, y1, x2, y2)
+
+
+def triple(x1: Column, y1: Column, x2: Column, y2: Column, x3: Column, y3: Column) -> Column:
+    return backend.triple(x1, y1, x2, y2, x3, y3)
+
+
+def compare_backends(size: int = 100_000, seed: int = 0) -> list[str]:
+    # Runs the same random input through every available backend, returns the kernels whose results differ
+    rng = random.Random(seed)
+    columns = [array('d', [rng.uniform(-1e3, 1e3) for _ in range(size)]) for _ in range(6)]
+    backends = [BACKENDS[name]() for name in available_backends()]
+    kernels = {
+        "apply": lambda b: b.apply(operator.sub, columns[0], columns[1]),
+        "length": lambda b: b.length(columns[0], columns[1]),
+        "dot": lambda b: b.dot(*columns[:4]),
+        "cross": lambda b: b.cross(*columns[:4]),
+        "triple": lambda b: b.triple(*columns),
+    }
+    mismatches = []
+    for name, kernel in kernels.items():
+        results = [array('d', kernel(b)) for b in backends]
+        if any(result != results[0] for result in results[1:]):
+            mismatches.append(name)
+    return mismatches
@@ -0,0 +1,111 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Self, Sequence
+import math, operator, os
+from point2d import Point2d
+from vector2d_array import Vector2dArray
+import kernels
+from kernels import Column
+
+# Each kernel takes input columns and returns output columns, they run inside the worker processes
+_KERNELS: dict[str, tuple[int, int, Callable[..., tuple[Column, ...]]]] = {
+    # name: (number of inputs, number of outputs, kernel)
+    "frompoints": (4, 2, lambda sx, sy, ex, ey: (kernels.backend.apply(operator.sub, ex, sx),
+                                                 kernels.backend.apply(operator.sub, ey, sy))),
+    "length": (2, 1, lambda xs, ys: (kernels.backend.length(xs, ys),)),
+    "dot": (4, 1, lambda x1, y1, x2, y2: (kernels.dot(x1, y1, x2, y2),)),
+}
+
+
+def _copy_into(target: memoryview, column: Column) -> None:
+    try:
+        target[:] = column
+    except (TypeError, ValueError, NotImplementedError): # Lists, strided or differently formatted buffers
+        target[:] = array('d', column)
+
+
+def _run_chunk(shm_name: str, size: int, kernel: str, start: int, stop: int, reduce: bool) -> float:
+    # Worker side: attaches to the shared block by name, so no column data is ever pickled.
+    # With reduce the sum of the first output of the chunk is returned
+    inputs, outputs, function = _KERNELS[kernel]
+    shm = SharedMemory(name=shm_name)
+    values = shm.buf.cast('d')
+    columns = [values[i * size + start:i * size + stop] for i in range(inputs + outputs)]
+    results = ()
+    try:
+        results = function(*columns[:inputs])
+        for target, result in zip(columns[inputs:], results):
+            _copy_into(target, result)
+        return math.fsum(results[0]) if reduce else 0.0
+    finally:
+        del results # Numpy results may still point into the shared block
+        for column in columns:
+            column.release()
+        values.release()
+        shm.close()
+
+
+
+class GeometryPipeline:
+    # Chunked map/reduce over big batches of Lab1 geometry in a pool of processes.
+    # Inputs are copied once into a shared memory block, workers read and write their chunk in place
+    def __init__(self, workers: int | None = None, chunk_size: int = 1 << 18) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def _run(self, kernel: str, columns: Sequence[Column], reduce: bool = False) -> tuple[list[Column], float]:
+        inputs, outputs, _ = _KERNELS[kernel]
+        size = len(columns[0])
+        if any(len(column) != size for column in columns):
+            raise ValueError("All input columns must have the same length")
+        if size == 0:
+            return [kernels.backend.column() for _ in range(outputs)], 0.0
+        shm = SharedMemory(create=True, size=8 * size * (inputs + outputs))
+        values = shm.buf.cast('d')
+        try:
+            for i, column in enumerate(columns):
+                _copy_into(values[i * size:(i + 1) * size], column)
+            futures = [self._executor.submit(_run_chunk, shm.name, size, kernel, start, min(start + self.chunk_size, size), reduce)
+                       for start in range(0, size, self.chunk_size)]
+            total = math.fsum(future.result() for future in futures)
+            if reduce: # Only the total is wanted, it was summed chunk by chunk in the workers
+                return [], total
+            results = [kernels.backend.column(values[i * size:(i + 1) * size]) for i in range(inputs, inputs + outputs)]
+            return results, total
+        finally:
+            values.release()
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    def _as_array(points: Sequence[Point2d] | Vector2dArray) -> Vector2dArray:
+        if isinstance(points, Vector2dArray):
+            return points
+        return Vector2dArray([point.x for point in points], [point.y for point in points])
+
+    def frompoints(self, starts: Sequence[Point2d] | Vector2dArray, ends: Sequence[Point2d] | Vector2dArray) -> Vector2dArray:
+        starts, ends = self._as_array(starts), self._as_array(ends)
+        (xs, ys), _ = self._run("frompoints", (starts.xs, starts.ys, ends.xs, ends.ys))
+        return Vector2dArray._fromcolumns(xs, ys)
+
+    def lengths(self, vectors: Vector2dArray) -> Column:
+        (result,), _ = self._run("length", (vectors.xs, vectors.ys))
+        return result
+
+    def total_length(self, vectors: Vector2dArray) -> float:
+        return self._run("length", (vectors.xs, vectors.ys), reduce=True)[1]
+
+    def dot(self, vectors1: Vector2dArray, vectors2: Vector2dArray) -> Column:
+        (result,), _ = self._run("dot", (vectors1.xs, vectors1.ys, vectors2.xs, vectors2.ys))
+        return result
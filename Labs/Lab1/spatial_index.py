@@ -0,0 +1,303 @@
+from itertools import count
+from typing import Iterable, Iterator, Protocol, Self
+import heapq
+from point2d import Point2d, WIDTH, HEIGHT
+
+
+class SpatialIndexProtocol(Protocol):
+    def insert(self, point: Point2d) -> None:
+        ...
+    def delete(self, point: Point2d) -> bool:
+        ...
+    def nearest(self, point: Point2d, k: int = 1) -> list[Point2d]:
+        ...
+    def within_radius(self, point: Point2d, radius: float) -> list[Point2d]:
+        ...
+    def within_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list[Point2d]:
+        ...
+
+
+def _squared_distance(point: Point2d, x: float, y: float) -> float:
+    dx = point.x - x
+    dy = point.y - y
+    return dx * dx + dy * dy
+
+
+def _squared_distance_to_box(x: float, y: float, x_min: float, y_min: float, x_max: float, y_max: float) -> float:
+    # 0 if (x, y) is inside the box
+    dx = x_min - x if x < x_min else x - x_max if x > x_max else 0
+    dy = y_min - y if y < y_min else y - y_max if y > y_max else 0
+    return dx * dx + dy * dy
+
+
+def _keep_nearest(best: list[tuple[float, int, Point2d]], k: int, distance: float, order: int, point: Point2d) -> None:
+    # best is a max-heap (negated distances) with at most k nearest points found so far
+    if len(best) < k:
+        heapq.heappush(best, (-distance, order, point))
+    elif distance < -best[0][0]:
+        heapq.heapreplace(best, (-distance, order, point))
+
+
+def _sorted_points(best: list[tuple[float, int, Point2d]]) -> list[Point2d]:
+    return [point for _, _, point in sorted(best, key=lambda item: (-item[0], item[1]))]
+
+
+
+class UniformGrid(SpatialIndexProtocol):
+    # The WIDTH x HEIGHT canvas is split into square cells, each cell keeps a plain list of its points
+    def __init__(self, cell_size: float = 32) -> None:
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+        self.cell_size = cell_size
+        self.columns = int(WIDTH // cell_size) + 1
+        self.rows = int(HEIGHT // cell_size) + 1
+        self._cells: list[list[Point2d]] = [[] for _ in range(self.columns * self.rows)]
+        self._size = 0
+
+    @classmethod
+    def bulk_load(cls, points: Iterable[Point2d], cell_size: float = 32) -> Self:
+        grid = cls(cell_size)
+        cells, cell_size, columns, rows = grid._cells, grid.cell_size, grid.columns, grid.rows
+        for point in points:
+            column = min(max(int(point.x // cell_size), 0), columns - 1)
+            row = min(max(int(point.y // cell_size), 0), rows - 1)
+            cells[row * columns + column].append(point)
+            grid._size += 1
+        return grid
+
+    def _column(self, x: float) -> int:
+        return min(max(int(x // self.cell_size), 0), self.columns - 1)
+
+    def _row(self, y: float) -> int:
+        return min(max(int(y // self.cell_size), 0), self.rows - 1)
+
+    def _cell(self, point: Point2d) -> list[Point2d]:
+        return self._cells[self._row(point.y) * self.columns + self._column(point.x)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Point2d]:
+        for cell in self._cells:
+            yield from cell
+
+    def insert(self, point: Point2d) -> None:
+        self._cell(point).append(point)
+        self._size += 1
+
+    def delete(self, point: Point2d) -> bool:
+        cell = self._cell(point)
+        try:
+            cell.remove(point)
+        except ValueError:
+            return False
+        self._size -= 1
+        return True
+
+    def within_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list[Point2d]:
+        result = []
+        for row in range(self._row(y_min), self._row(y_max) + 1):
+            offset = row * self.columns
+            for column in range(self._column(x_min), self._column(x_max) + 1):
+                result.extend(point for point in self._cells[offset + column]
+                              if x_min <= point.x <= x_max and y_min <= point.y <= y_max)
+        return result
+
+    def within_radius(self, point: Point2d, radius: float) -> list[Point2d]:
+        x, y = point.x, point.y
+        limit = radius * radius
+        return [candidate for candidate in self.within_rect(x - radius, y - radius, x + radius, y + radius)
+                if _squared_distance(candidate, x, y) <= limit]
+
+    def nearest(self, point: Point2d, k: int = 1) -> list[Point2d]:
+        # Cells are visited ring by ring around the cell of the point, until no unvisited cell can hold anything closer
+        if k <= 0: # The heap would be empty and best[0] fail
+            return []
+        x, y = point.x, point.y
+        center_column, center_row = self._column(x), self._row(y)
+        best: list[tuple[float, int, Point2d]] = []
+        order = count()
+        max_ring = max(self.columns, self.rows)
+        for ring in range(max_ring + 1):
+            for row in range(center_row - ring, center_row + ring + 1):
+                if not 0 <= row < self.rows:
+                    continue
+                edge = row in (center_row - ring, center_row + ring)
+                step = 1 if edge else 2 * ring or 1
+                for column in range(center_column - ring, center_column + ring + 1, step):
+                    if not 0 <= column < self.columns:
+                        continue
+                    for candidate in self._cells[row * self.columns + column]:
+                        _keep_nearest(best, k, _squared_distance(candidate, x, y), next(order), candidate)
+            if len(best) == k:
+                # Distance from the point to the border of the already visited square of cells
+                reach = min(x - (center_column - ring) * self.cell_size,
+                            (center_column + ring + 1) * self.cell_size - x,
+                            y - (center_row - ring) * self.cell_size,
+                            (center_row + ring + 1) * self.cell_size - y)
+                if -best[0][0] <= reach * reach:
+                    break
+        return _sorted_points(best)
+
+
+
+class _QuadNode:
+    __slots__ = ("x_min", "y_min", "x_max", "y_max", "points", "children", "size")
+
+    def __init__(self, x_min: float, y_min: float, x_max: float, y_max: float) -> None:
+        self.x_min, self.y_min, self.x_max, self.y_max = x_min, y_min, x_max, y_max
+        self.points: list[Point2d] = []
+        self.children: list["_QuadNode"] | None = None
+        self.size = 0
+
+    def child_for(self, point: Point2d) -> "_QuadNode":
+        x_mid = (self.x_min + self.x_max) / 2
+        y_mid = (self.y_min + self.y_max) / 2
+        return self.children[(point.x >= x_mid) + 2 * (point.y >= y_mid)]
+
+    def split(self) -> None:
+        x_mid = (self.x_min + self.x_max) / 2
+        y_mid = (self.y_min + self.y_max) / 2
+        self.children = [
+            _QuadNode(self.x_min, self.y_min, x_mid, y_mid),
+            _QuadNode(x_mid, self.y_min, self.x_max, y_mid),
+            _QuadNode(self.x_min, y_mid, x_mid, self.y_max),
+            _QuadNode(x_mid, y_mid, self.x_max, self.y_max),
+        ]
+
+    def iter_points(self) -> Iterator[Point2d]:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.children is None:
+                yield from node.points
+            else:
+                stack.extend(node.children)
+
+
+
+class QuadTree(SpatialIndexProtocol):
+    # Leaves hold up to `capacity` points and are split into four quadrants when they overflow
+    def __init__(self, capacity: int = 16, max_depth: int = 16) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self._root = _QuadNode(0, 0, WIDTH, HEIGHT)
+
+    @classmethod
+    def bulk_load(cls, points: Iterable[Point2d], capacity: int = 16, max_depth: int = 16) -> Self:
+        # Top-down build: each level partitions its points once instead of inserting them one by one
+        tree = cls(capacity, max_depth)
+        stack = [(tree._root, list(points), 0)]
+        while stack:
+            node, node_points, depth = stack.pop()
+            node.size = len(node_points)
+            if len(node_points) <= capacity or depth >= max_depth:
+                node.points = node_points
+                continue
+            node.split()
+            parts: list[list[Point2d]] = [[], [], [], []]
+            x_mid = (node.x_min + node.x_max) / 2
+            y_mid = (node.y_min + node.y_max) / 2
+            for point in node_points:
+                parts[(point.x >= x_mid) + 2 * (point.y >= y_mid)].append(point)
+            stack.extend((child, part, depth + 1) for child, part in zip(node.children, parts))
+        return tree
+
+    def __len__(self) -> int:
+        return self._root.size
+
+    def __iter__(self) -> Iterator[Point2d]:
+        return self._root.iter_points()
+
+    def insert(self, point: Point2d) -> None:
+        node, depth = self._root, 0
+        while node.children is not None:
+            node.size += 1
+            node = node.child_for(point)
+            depth += 1
+        node.size += 1
+        node.points.append(point)
+        while len(node.points) > self.capacity and depth < self.max_depth:
+            node.split()
+            for moved in node.points:
+                child = node.child_for(moved)
+                child.points.append(moved)
+                child.size += 1
+            node.points = []
+            # All points may have landed in the same quadrant, then it has to be split again
+            node = max(node.children, key=lambda child: child.size)
+            depth += 1
+
+    def delete(self, point: Point2d) -> bool:
+        path = [self._root]
+        while path[-1].children is not None:
+            path.append(path[-1].child_for(point))
+        leaf = path[-1]
+        try:
+            leaf.points.remove(point)
+        except ValueError:
+            return False
+        for node in path:
+            node.size -= 1
+        # Collapse subtrees that became small enough to be a single leaf again
+        for node in path[:-1]:
+            if node.size <= self.capacity:
+                node.points = list(node.iter_points())
+                node.children = None
+                break
+        return True
+
+    def within_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list[Point2d]:
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.size == 0 or node.x_min > x_max or node.x_max < x_min or node.y_min > y_max or node.y_max < y_min:
+                continue
+            if node.children is not None:
+                stack.extend(node.children)
+            elif x_min <= node.x_min and node.x_max <= x_max and y_min <= node.y_min and node.y_max <= y_max:
+                result.extend(node.points)
+            else:
+                result.extend(point for point in node.points
+                              if x_min <= point.x <= x_max and y_min <= point.y <= y_max)
+        return result
+
+    def within_radius(self, point: Point2d, radius: float) -> list[Point2d]:
+        x, y = point.x, point.y
+        limit = radius * radius
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.size == 0 or _squared_distance_to_box(x, y, node.x_min, node.y_min, node.x_max, node.y_max) > limit:
+                continue
+            if node.children is not None:
+                stack.extend(node.children)
+            else:
+                result.extend(candidate for candidate in node.points if _squared_distance(candidate, x, y) <= limit)
+        return result
+
+    def nearest(self, point: Point2d, k: int = 1) -> list[Point2d]:
+        # Best-first search: nodes are visited in order of their distance to the point
+        if k <= 0: # The heap would be empty and best[0] fail
+            return []
+        x, y = point.x, point.y
+        best: list[tuple[float, int, Point2d]] = []
+        order = count()
+        queue = [(0.0, next(order), self._root)]
+        while queue:
+            distance, _, node = heapq.heappop(queue)
+            if len(best) == k and distance > -best[0][0]:
+                break
+            if node.children is None:
+                for candidate in node.points:
+                    _keep_nearest(best, k, _squared_distance(candidate, x, y), next(order), candidate)
+                continue
+            for child in node.children:
+                if child.size:
+                    heapq.heappush(queue, (_squared_distance_to_box(x, y, child.x_min, child.y_min, child.x_max, child.y_max),
+                                           next(order), child))
+        return _sorted_points(best)
@@ -0,0 +1,138 @@
+from typing import BinaryIO, Iterable, Iterator, Self
+import mmap, struct
+from point2d import Point2d
+from vector2d import Vector2d
+from vector2d_array import Vector2dArray
+import kernels
+
+# File layout: 16 byte header, then `count` packed little-endian float64 (x, y) pairs
+MAGIC = b"P2DV"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxQ") # magic, version, kind, padding, count
+KIND_POINTS = 0
+KIND_VECTORS = 1
+PAIR = struct.Struct("<dd")
+
+
+def _kind_of(items: Iterable[Point2d | Vector2d] | Vector2dArray) -> int:
+    if isinstance(items, Vector2dArray):
+        return KIND_VECTORS
+    first = next(iter(items), None)
+    return KIND_POINTS if isinstance(first, Point2d) else KIND_VECTORS
+
+
+def _write(file: BinaryIO, kind: int, pairs: list[tuple[float, float]] | Vector2dArray) -> None:
+    file.write(HEADER.pack(MAGIC, VERSION, kind, len(pairs)))
+    if isinstance(pairs, Vector2dArray):
+        # Interleave the x and y columns in chunks, so big arrays are never fully duplicated in memory
+        chunk = 1 << 16
+        for start in range(0, len(pairs), chunk):
+            xs, ys = pairs.xs[start:start + chunk], pairs.ys[start:start + chunk]
+            if kernels.backend.name == "numpy":
+                interleaved = kernels.backend.np.empty(2 * len(xs), dtype="<f8")
+                interleaved[0::2], interleaved[1::2] = xs, ys
+                file.write(interleaved.tobytes())
+            else:
+                interleaved = [value for pair in zip(xs, ys) for value in pair]
+                file.write(struct.pack(f"<{len(interleaved)}d", *interleaved))
+    else:
+        for x, y in pairs:
+            file.write(PAIR.pack(x, y))
+
+
+def dump(filepath: str, items: Iterable[Point2d | Vector2d] | Vector2dArray, kind: int | None = None) -> None:
+    # kind is guessed from the items if not given, a Vector2dArray is stored as vectors by default
+    if not isinstance(items, Vector2dArray):
+        items = list(items)
+    if kind is None:
+        kind = _kind_of(items)
+    pairs = items if isinstance(items, Vector2dArray) else [(item.x, item.y) for item in items]
+    with open(filepath, "wb") as file:
+        _write(file, kind, pairs)
+
+
+def _read_header(buffer: bytes | memoryview | mmap.mmap) -> tuple[int, int]:
+    if len(buffer) < HEADER.size:
+        raise ValueError("File is too short to be a point/vector file")
+    magic, version, kind, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"Wrong file signature: {magic!r}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported file version: {version}")
+    if kind not in (KIND_POINTS, KIND_VECTORS):
+        raise ValueError(f"Unknown item kind: {kind}")
+    if len(buffer) < HEADER.size + count * PAIR.size:
+        raise ValueError("File is truncated")
+    return kind, count
+
+
+
+class MappedItems:
+    # Read-only zero-copy view over a stored file. Only the pages that are touched are read from disk
+    def __init__(self, filepath: str) -> None:
+        self._file = open(filepath, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.kind, self._count = _read_header(self._mmap)
+        except Exception:
+            self._file.close()
+            raise
+        # Little-endian float64 pairs; memoryview.cast uses native order, which is little-endian on every supported platform
+        self._values = memoryview(self._mmap)[HEADER.size:HEADER.size + self._count * PAIR.size].cast("d")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._values.release()
+        self._file.close()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass # Arrays returned by array() still use the mapping, it is unmapped when they are gone
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _make(self, x: float, y: float) -> Point2d | Vector2d:
+        # Points from a file are untrusted input, so they go through the checked constructor
+        return Point2d(x, y) if self.kind == KIND_POINTS else Vector2d._unchecked(x, y)
+
+    def __getitem__(self, index: int) -> Point2d | Vector2d:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Index out of range")
+        return self._make(self._values[2 * index], self._values[2 * index + 1])
+
+    def __iter__(self) -> Iterator[Point2d | Vector2d]:
+        values = self._values
+        for index in range(0, 2 * self._count, 2):
+            yield self._make(values[index], values[index + 1])
+
+    def array(self) -> Vector2dArray:
+        # Zero-copy: the columns are strided views into the mapped file (read-only)
+        if kernels.backend.name == "numpy":
+            values = kernels.backend.np.frombuffer(self._mmap, dtype="<f8", count=2 * self._count, offset=HEADER.size)
+        else:
+            values = self._values
+        return Vector2dArray._fromcolumns(values[0::2], values[1::2])
+
+
+def open_mmap(filepath: str) -> MappedItems:
+    return MappedItems(filepath)
+
+
+def load(filepath: str) -> list[Point2d | Vector2d]:
+    with open_mmap(filepath) as items:
+        return list(items)
+
+
+def load_array(filepath: str) -> Vector2dArray:
+    # Copies the file into memory, unlike open_mmap(...).array()
+    with open_mmap(filepath) as items:
+        array = items.array()
+        return Vector2dArray._fromcolumns(kernels.backend.column(array.xs), kernels.backend.column(array.ys))
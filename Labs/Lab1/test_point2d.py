@@ -0,0 +1,32 @@
+import unittest
+from Point2d import FrozenPoint2d, Point2d
+
+
+class FrozenPoint2dUncheckedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        FrozenPoint2d.clear_pool()
+
+    def test_unchecked_builds_a_frozen_point(self) -> None:
+        point = FrozenPoint2d._unchecked(1.5, 2.5)
+        self.assertIsInstance(point, FrozenPoint2d)
+        self.assertEqual((point.x, point.y), (1.5, 2.5))
+        self.assertEqual(hash(point), hash(FrozenPoint2d(1.5, 2.5)))
+
+    def test_unchecked_skips_the_bounds_check(self) -> None:
+        point = FrozenPoint2d._unchecked(-1.0, 5000.0)
+        self.assertEqual((point.x, point.y), (-1.0, 5000.0))
+
+    def test_unchecked_shares_the_pool(self) -> None:
+        point = FrozenPoint2d._unchecked(1, 2)
+        self.assertIs(FrozenPoint2d(1, 2), point)
+        self.assertIs(FrozenPoint2d._unchecked(1, 2), point)
+        self.assertEqual(FrozenPoint2d.pool_info(), {"hits": 2, "misses": 1, "size": 1})
+
+    def test_point2d_unchecked_is_unchanged(self) -> None:
+        point = Point2d._unchecked(3, 4)
+        self.assertIs(type(point), Point2d)
+        self.assertEqual((point.x, point.y), (3, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os, tempfile, unittest
+from array import array
+import kernels, storage
+from vector2d_array import Vector2dArray
+
+
+class PythonBackendStorageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.previous = kernels.backend.name
+        kernels.use_backend("python")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "vectors.p2d")
+
+    def tearDown(self) -> None:
+        kernels.use_backend(self.previous)
+        self.directory.cleanup()
+
+    def test_load_array_round_trip(self) -> None:
+        vectors = Vector2dArray([1.5, -2.0, 3.25], [4.0, 5.5, -6.0])
+        storage.dump(self.path, vectors)
+        loaded = storage.load_array(self.path)
+        self.assertEqual(list(loaded.xs), [1.5, -2.0, 3.25])
+        self.assertEqual(list(loaded.ys), [4.0, 5.5, -6.0])
+        self.assertEqual(loaded, vectors)
+
+    def test_mapped_columns_build_an_array(self) -> None:
+        storage.dump(self.path, Vector2dArray([1.0, 2.0], [3.0, 4.0]))
+        with storage.open_mmap(self.path) as items:
+            mapped = items.array()
+            copied = Vector2dArray(mapped.xs, mapped.ys)
+            del mapped
+        self.assertEqual(list(copied.xs), [1.0, 2.0])
+        self.assertEqual(list(copied.ys), [3.0, 4.0])
+
+    def test_strided_memoryview_column(self) -> None:
+        values = memoryview(array('d', [1, 2, 3, 4]))
+        self.assertEqual(list(kernels.backend.column(values[0::2])), [1.0, 3.0])
+        self.assertEqual(list(kernels.backend.column(values)), [1.0, 2.0, 3.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+from typing import Callable, Iterable, Iterator, Self, Sequence
+import operator
+from point2d import Point2d
+from vector2d import Vector2d
+import kernels
+from kernels import Column
+
+
+
+class Vector2dArray:
+    # Struct of arrays: all x values in one column, all y values in the other
+    __slots__ = ("xs", "ys")
+
+    def __init__(self, xs: Iterable[float] = (), ys: Iterable[float] = ()) -> None:
+        self.xs = kernels.backend.column(xs)
+        self.ys = kernels.backend.column(ys)
+        if len(self.xs) != len(self.ys):
+            raise ValueError("x and y columns must have the same length")
+
+    @classmethod
+    def _fromcolumns(cls, xs: Column, ys: Column) -> Self:
+        # Wraps already built columns without copying them
+        result = cls.__new__(cls)
+        result.xs = xs
+        result.ys = ys
+        return result
+
+    @classmethod
+    def fromvectors(cls, vectors: Iterable[Vector2d]) -> Self:
+        vectors = list(vectors)
+        return cls([vector.x for vector in vectors], [vector.y for vector in vectors])
+
+    @classmethod
+    def frompoints(cls, starts: Sequence[Point2d] | Self, ends: Sequence[Point2d] | Self) -> Self:
+        # Points can be given either as Point2d objects or as an array of coordinates
+        if len(starts) != len(ends):
+            raise ValueError("Number of start and end points must be the same")
+        if not isinstance(starts, Vector2dArray):
+            starts = cls([point.x for point in starts], [point.y for point in starts])
+        if not isinstance(ends, Vector2dArray):
+            ends = cls([point.x for point in ends], [point.y for point in ends])
+        return ends - starts
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, index: int | slice) -> Vector2d | Self:
+        if isinstance(index, slice):
+            xs, ys = self.xs[index], self.ys[index]
+            if hasattr(xs, "copy"): # numpy slices are views into this array, array('d') slices are already copies
+                xs, ys = xs.copy(), ys.copy()
+            return self._fromcolumns(xs, ys)
+        return Vector2d._unchecked(float(self.xs[index]), float(self.ys[index]))
+
+    def __setitem__(self, index: int, value: Vector2d) -> None:
+        self.xs[index] = value.x
+        self.ys[index] = value.y
+
+    def __iter__(self) -> Iterator[Vector2d]:
+        for x, y in zip(self.xs, self.ys):
+            yield Vector2d._unchecked(float(x), float(y))
+
+    def __eq__(self, value: Self) -> bool:
+        return (len(self) == len(value)
+                and all(map(operator.eq, self.xs, value.xs))
+                and all(map(operator.eq, self.ys, value.ys)))
+
+    def __str__(self) -> str:
+        return f"Vector2dArray({list(self)})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def _check_length(self, other: Self) -> None:
+        if len(self) != len(other):
+            raise ValueError(f"Vector arrays have different lengths: {len(self)} and {len(other)}")
+
+    def _binary(self, op: Callable[[float, float], float], value: Self | Vector2d) -> Self:
+        # A single Vector2d is applied to every vector of the array
+        if isinstance(value, Vector2dArray):
+            self._check_length(value)
+        return self._fromcolumns(kernels.backend.apply(op, self.xs, value.xs if isinstance(value, Vector2dArray) else value.x),
+                                 kernels.backend.apply(op, self.ys, value.ys if isinstance(value, Vector2dArray) else value.y))
+
+    def __abs__(self) -> Column:
+        return kernels.backend.length(self.xs, self.ys)
+
+    def __add__(self, value: Self | Vector2d) -> Self:
+        return self._binary(operator.add, value)
+
+    def __sub__(self, value: Self | Vector2d) -> Self:
+        return self._binary(operator.sub, value)
+
+    def __mul__(self, value: float) -> Self:
+        return self._fromcolumns(kernels.backend.apply(operator.mul, self.xs, value), kernels.backend.apply(operator.mul, self.ys, value))
+
+    def __rmul__(self, value: float) -> Self:
+        return self * value
+
+    def __truediv__(self, value: float) -> Self: # Floor division, same as Vector2d.__truediv__
+        return self._fromcolumns(kernels.backend.apply(operator.floordiv, self.xs, value), kernels.backend.apply(operator.floordiv, self.ys, value))
+
+    def dot(self, other: Self) -> Column:
+        self._check_length(other)
+        return kernels.dot(self.xs, self.ys, other.xs, other.ys)
+
+    @staticmethod
+    def dot_product(array1: "Vector2dArray", array2: "Vector2dArray") -> Column:
+        return array1.dot(array2)
+
+    def cross(self, other: Self) -> Column:
+        # Unlike Vector2d.cross, only the z values are returned, not Vector2d(z, 0)
+        self._check_length(other)
+        return kernels.cross(self.xs, self.ys, other.xs, other.ys)
+
+    @staticmethod
+    def cross_product(array1: "Vector2dArray", array2: "Vector2dArray") -> Column:
+        return array1.cross(array2)
+
+    def triple(self, array2: Self, array3: Self) -> Column:
+        self._check_length(array2)
+        self._check_length(array3)
+        return kernels.triple(self.xs, self.ys, array2.xs, array2.ys, array3.xs, array3.ys)
+
+    @staticmethod
+    def triple_product(array1: "Vector2dArray", array2: "Vector2dArray", array3: "Vector2dArray") -> Column:
+        return array1.triple(array2, array3)
@@ -0,0 +1,277 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+from time import perf_counter
+import io, json, os, platform, sys, threading, tracemalloc
+from lab2_simple import Printer, Color
+from screen import Screen
+from render_queue import RenderQueue
+from rasterizer import Rasterizer
+
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CountingRaw(io.RawIOBase):
+    # Stands in for the terminal file descriptor: every write here would be a write() syscall
+    def __init__(self) -> None:
+        self.calls = 0
+        self.bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self.calls += 1
+        self.bytes += len(data)
+        return len(data)
+
+
+class PtyRaw(io.FileIO):
+    # Slave side of a pseudo terminal, the closest thing to a real terminal that can run unattended.
+    # The master side is read by a background thread, otherwise writes block once the pty buffer is full
+    def __init__(self) -> None:
+        self._master, slave = os.openpty()
+        super().__init__(slave, "w")
+        self.calls = 0
+        self.bytes = 0
+        self._reader = threading.Thread(target=self._drain, daemon=True)
+        self._reader.start()
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self._master, 65536):
+                pass
+        except OSError: # The slave side was closed
+            pass
+
+    def write(self, data: bytes) -> int:
+        self.calls += 1
+        written = super().write(data)
+        self.bytes += written
+        return written
+
+    def close(self) -> None:
+        super().close()
+        self._reader.join()
+        os.close(self._master)
+
+
+class CountingStream(io.TextIOWrapper):
+    # Counts the write calls made on sys.stdout by the printer itself
+    def __init__(self, raw: CountingRaw | PtyRaw, line_buffering: bool) -> None:
+        super().__init__(io.BufferedWriter(raw) if line_buffering else raw,
+                         encoding="utf-8", line_buffering=line_buffering, write_through=not line_buffering)
+        self.calls = 0
+
+    def write(self, text: str) -> int:
+        self.calls += 1
+        return super().write(text)
+
+
+def _render(text: str, runs: int, line_buffering: bool) -> dict[str, float]:
+    raw = CountingRaw()
+    stream = CountingStream(raw, line_buffering)
+    start = perf_counter()
+    with redirect_stdout(stream):
+        for _ in range(runs):
+            Printer.print_(text, Color.GREEN, (0, 0), "#")
+        stream.flush()
+    elapsed = perf_counter() - start
+    return {"seconds": elapsed, "stdout writes": stream.calls / runs, "syscalls": raw.calls / runs, "bytes": raw.bytes / runs}
+
+
+def bench_frame_buffer(runs: int = 1000, text: str = "OOP LABS ARE COOL ABC") -> None:
+    for font in ("font5.txt", "font7.txt"):
+        Printer.load_font(os.path.join(FONT_DIR, font))
+        print(f"{font}: {len(text)} characters, {runs} renders, values per render")
+        for buffered in (False, True):
+            Printer.buffered = buffered
+            for line_buffering, target in ((True, "tty (line buffered)"), (False, "unbuffered pipe")):
+                result = _render(text, runs, line_buffering)
+                print(f"  {'frame buffer' if buffered else 'per glyph':<12} {target:<20} "
+                      f"{result['stdout writes']:6.0f} stdout writes   {result['syscalls']:6.0f} syscalls   "
+                      f"{result['bytes']:7.0f} bytes   {result['seconds'] / runs * 1e6:8.1f} us")
+        Printer.buffered = False
+
+
+def _letters(value: int, width: int = 4) -> str:
+    # The fonts only have letters, so numbers are written in base 26 with A..Z as digits
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, 26)
+        digits.append(chr(ord("A") + digit))
+    return "".join(reversed(digits))
+
+
+def bench_screen(updates: int = 1000) -> None:
+    # A live counter: the label stays the same, only the last digits change between redraws
+    Printer.load_font(os.path.join(FONT_DIR, "font7.txt"))
+    print(f"Redrawing a counter {updates} times, values per redraw")
+    for name, buffered, screen in (("per glyph", False, None), ("frame buffer", True, None), ("screen diff", False, Screen())):
+        Printer.buffered, Printer.screen = buffered, screen
+        raw = CountingRaw()
+        stream = CountingStream(raw, line_buffering=True)
+        start = perf_counter()
+        with redirect_stdout(stream):
+            for value in range(updates):
+                Printer.print_(f"COUNTER {_letters(value)}", Color.GREEN, (0, 0), "#")
+            stream.flush()
+        elapsed = perf_counter() - start
+        print(f"  {name:<12} {raw.bytes / updates:8.0f} bytes   {elapsed / updates * 1e6:8.1f} us")
+    Printer.buffered, Printer.screen = False, None
+
+
+def bench_queue(updates: int = 1000) -> None:
+    # The same counter redrawn from the caller's thread and through the render queue, where redraws coalesce
+    Printer.load_font(os.path.join(FONT_DIR, "font7.txt"))
+    print(f"Redrawing a counter {updates} times")
+    for name, queue in (("direct", None), ("render queue", RenderQueue(interval=0.001))):
+        raw = CountingRaw()
+        stream = CountingStream(raw, line_buffering=True)
+        Printer.buffered, Printer.queue = True, queue
+        start = perf_counter()
+        with redirect_stdout(stream):
+            for value in range(updates):
+                Printer.print_(f"COUNTER {_letters(value)}", Color.GREEN, (0, 0), "#")
+            submitted = perf_counter() - start
+            if queue is not None:
+                queue.close()
+            stream.flush()
+        elapsed = perf_counter() - start
+        print(f"  {name:<12} {submitted / updates * 1e6:8.1f} us per call   {elapsed:6.3f} s total   "
+              f"{raw.calls:6} syscalls   {raw.bytes:9} bytes")
+    Printer.buffered, Printer.queue = False, None
+
+
+def bench_rasterizer(labels: int = 10000) -> None:
+    texts = [f"LABEL {_letters(value)}" for value in range(labels)]
+    for font in ("font5.txt", "font7.txt"):
+        rasterizer = Rasterizer(os.path.join(FONT_DIR, font), "#")
+        for kind in ("lines", "bitmap", "pbm"):
+            start = perf_counter()
+            rasterizer.rasterize_all(texts, kind)
+            elapsed = perf_counter() - start
+            print(f"{font:<10} {kind:<7} {labels} labels {elapsed:7.3f} s   {elapsed / labels * 1e6:6.1f} us per label")
+
+
+CORPORA = {
+    "label": ["OOP LABS ARE COOL"],
+    "alphabet": ["ABCDEFGHIJKLMNOPQRSTUVWXYZ"],
+    "counter": [f"COUNTER {_letters(value)}" for value in range(100)],
+}
+SINKS = {"null": CountingRaw, "pty": PtyRaw}
+
+
+def _print_static(lines: list[str], font: str) -> None:
+    for line in lines:
+        Printer.print_(line, Color.GREEN, (0, 0), "#", font=font)
+
+
+def _print_instance(lines: list[str], font: str) -> None:
+    with Printer(Color.GREEN, (0, 0), "#", font=font) as printer:
+        for line in lines:
+            printer.current_x = 0
+            printer.print(line)
+
+
+APIS = {"print_": _print_static, "print": _print_instance}
+
+
+def _measure(draw, lines: list[str], font: str, sink: str, runs: int) -> dict[str, float]:
+    raw = SINKS[sink]()
+    stream = CountingStream(raw, line_buffering=True)
+    with redirect_stdout(stream):
+        draw(lines, font) # Warm up the glyph cache and the font registry
+        stream.flush()
+        raw.calls = raw.bytes = 0
+        start = perf_counter()
+        for _ in range(runs):
+            draw(lines, font)
+        stream.flush()
+        elapsed = perf_counter() - start
+        raw_bytes, raw_calls = raw.bytes, raw.calls # Before the traced run below adds its own writes
+        stream.calls = 0
+        # Allocations are counted in a separate run, tracing slows everything down
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        draw(lines, font)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stream.flush()
+    chars = sum(len(line) for line in lines)
+    raw.close()
+    return {
+        "chars_per_sec": chars * runs / elapsed,
+        "bytes_per_char": raw_bytes / (chars * runs),
+        "write_calls_per_render": stream.calls,
+        "syscalls_per_render": raw_calls / runs,
+        "alloc_blocks": sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0),
+        "alloc_peak_bytes": peak,
+    }
+
+
+def bench_suite(runs: int = 100, output: str = "benchmark_results.json") -> None:
+    # Every corpus in both fonts, through both printing APIs, per glyph and frame buffered, into a null sink and a pty.
+    # The results are saved as JSON: python benchmark.py compare old.json new.json shows what changed
+    results = []
+    for font in ("font5.txt", "font7.txt"):
+        path = os.path.join(FONT_DIR, font)
+        for corpus, lines in CORPORA.items():
+            for api, draw in APIS.items():
+                for buffered in (False, True):
+                    Printer.buffered = buffered
+                    for sink in SINKS:
+                        result = {"font": font, "corpus": corpus, "api": api,
+                                  "mode": "frame buffer" if buffered else "per glyph", "sink": sink}
+                        result.update(_measure(draw, lines, path, sink, runs))
+                        results.append(result)
+                        print(f"{font:<10} {corpus:<9} {api:<7} {result['mode']:<13} {sink:<5}"
+                              f"{result['chars_per_sec']:10.0f} chars/s {result['bytes_per_char']:7.1f} bytes/char "
+                              f"{result['syscalls_per_render']:7.1f} syscalls {result['alloc_blocks']:6} blocks")
+    Printer.buffered = False
+    report = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "results": results,
+    }
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Saved to {output}")
+
+
+def compare(old: str, new: str) -> None:
+    # Prints new / old for every measurement of two saved suites
+    with open(old) as file:
+        old_results = {_case(result): result for result in json.load(file)["results"]}
+    with open(new) as file:
+        new_results = json.load(file)["results"]
+    for result in new_results:
+        previous = old_results.get(_case(result))
+        if previous is None:
+            continue
+        ratios = "  ".join(f"{key} x{result[key] / previous[key]:.2f}" for key in ("chars_per_sec", "bytes_per_char", "alloc_blocks")
+                           if previous[key])
+        print(f"{' '.join(_case(result)):<50} {ratios}")
+
+
+def _case(result: dict) -> tuple[str, ...]:
+    return (result["font"], result["corpus"], result["api"], result["mode"], result["sink"])
+
+
+BENCHMARKS = {
+    "frame_buffer": bench_frame_buffer,
+    "screen": bench_screen,
+    "queue": bench_queue,
+    "rasterizer": bench_rasterizer,
+    "suite": bench_suite,
+    "compare": compare,
+}
+
+
+if __name__ == "__main__":
+    # python benchmark.py [name] [runs] [output file]
+    name = sys.argv[1] if len(sys.argv) > 1 else "frame_buffer"
+    args = [int(arg) if arg.isdigit() else arg for arg in sys.argv[2:]]
+    BENCHMARKS[name](*args)
@@ -0,0 +1,135 @@
+from collections.abc import Mapping
+from typing import Iterator, Self
+import bisect, json, mmap, struct, sys
+
+# Compiled font layout:
+#   header       magic, version, glyph height, glyph width, number of glyphs
+#   index table  (code point, offset of the bitmap) per glyph, sorted by code point
+#   bitmaps      one bit per pixel, rows one after another, most significant bit first
+MAGIC = b"FNT1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHH")
+INDEX_ENTRY = struct.Struct("<II")
+
+
+def _header_value(line: str, marker: str) -> int:
+    # font5.txt/font7.txt write sizes as numbers, older fonts as a row of '|' (height) or '_' (width)
+    line = line.strip()
+    return int(line) if line.isdigit() else line.count(marker)
+
+
+def parse_text_font(filename: str) -> tuple[int, int, dict[str, list[str]]]:
+    glyphs: dict[str, list[str]] = {}
+    with open(filename, "r") as file:
+        height = _header_value(file.readline(), '|')
+        width = _header_value(file.readline(), '_')
+        while True:
+            char = file.readline().replace('-', '').strip()
+            if char == '':
+                break
+            rows = [file.readline().rstrip("\n")[:width].ljust(width) for _ in range(height)]
+            if any('-' in row for row in rows):
+                raise ValueError(f"Font file is not valid, character height is not consistent. List of correct characters: {glyphs.keys()}")
+            glyphs[char] = rows
+    return height, width, glyphs
+
+
+def parse_json_font(filename: str) -> tuple[int, int, dict[str, list[str]]]:
+    # Same structure json_to_txt.py reads: {char: [row, row, ...]}
+    with open(filename, "r") as file:
+        info = json.load(file)
+    height = max(len(rows) for rows in info.values())
+    width = max(len(row) for rows in info.values() for row in rows)
+    glyphs = {char: [row.ljust(width) for row in rows] + [' ' * width] * (height - len(rows)) for char, rows in info.items()}
+    return height, width, glyphs
+
+
+def compile_font(source: str, target: str) -> None:
+    height, width, glyphs = parse_json_font(source) if source.endswith(".json") else parse_text_font(source)
+    glyphs.setdefault(' ', [' ' * width] * height)
+    glyph_size = (width * height + 7) // 8
+    data_start = HEADER.size + INDEX_ENTRY.size * len(glyphs)
+    index, bitmaps = [], []
+    for number, char in enumerate(sorted(glyphs, key=ord)):
+        bits = 0
+        for row in glyphs[char]:
+            for pixel in row:
+                bits = (bits << 1) | (pixel != ' ')
+        bits <<= glyph_size * 8 - width * height
+        index.append(INDEX_ENTRY.pack(ord(char), data_start + number * glyph_size))
+        bitmaps.append(bits.to_bytes(glyph_size, "big"))
+    with open(target, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, height, width, len(glyphs)))
+        file.write(b"".join(index))
+        file.write(b"".join(bitmaps))
+
+
+def is_compiled_font(filename: str) -> bool:
+    with open(filename, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+
+class CompiledFont(Mapping[str, list[str]]):
+    # Read-only char -> rows mapping over a memory-mapped compiled font. Only the index table is read
+    # when the font is opened, every glyph is decoded the first time it is used
+    def __init__(self, filename: str) -> None:
+        with open(filename, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.height, self.width, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{filename} is not a compiled font of version {VERSION}")
+        entries = [INDEX_ENTRY.unpack_from(self._mmap, HEADER.size + i * INDEX_ENTRY.size) for i in range(count)]
+        self._code_points = [code_point for code_point, _ in entries]
+        self._offsets = [offset for _, offset in entries]
+        self._glyph_size = (self.width * self.height + 7) // 8
+        self._decoded: dict[str, list[str]] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _find(self, char: str) -> int:
+        if len(char) != 1:
+            return -1
+        position = bisect.bisect_left(self._code_points, ord(char))
+        if position < len(self._code_points) and self._code_points[position] == ord(char):
+            return position
+        return -1
+
+    def __contains__(self, char: object) -> bool:
+        return isinstance(char, str) and (char in self._decoded or self._find(char) >= 0)
+
+    def __getitem__(self, char: str) -> list[str]:
+        rows = self._decoded.get(char)
+        if rows is not None:
+            return rows
+        position = self._find(char)
+        if position < 0:
+            raise KeyError(char)
+        offset = self._offsets[position]
+        bits = int.from_bytes(self._mmap[offset:offset + self._glyph_size], "big") >> (self._glyph_size * 8 - self.width * self.height)
+        pixels = format(bits, f"0{self.width * self.height}b").replace('0', ' ').replace('1', '*')
+        rows = [pixels[start:start + self.width] for start in range(0, len(pixels), self.width)]
+        self._decoded[char] = rows
+        return rows
+
+    def __iter__(self) -> Iterator[str]:
+        return (chr(code_point) for code_point in self._code_points)
+
+    def __len__(self) -> int:
+        return len(self._code_points)
+
+
+if __name__ == "__main__":
+    # python font_compiler.py font7.txt font7.fnt
+    if len(sys.argv) != 3:
+        print("Usage: python font_compiler.py <font.txt | font.json> <compiled font>")
+        sys.exit(1)
+    compile_font(sys.argv[1], sys.argv[2])
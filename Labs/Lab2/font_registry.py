@@ -0,0 +1,83 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+import os, threading, time
+from font_compiler import CompiledFont, is_compiled_font, parse_json_font, parse_text_font
+
+
+@dataclass(frozen=True)
+class Font:
+    path: str
+    mtime: int
+    height: int
+    width: int
+    glyphs: Mapping[str, list[str]]
+
+    @property
+    def key(self) -> tuple[str, int]:
+        # Changes when the file is edited, so caches keyed by it never return glyphs of the old version
+        return (self.path, self.mtime)
+
+
+def _load(path: str, mtime: int) -> Font:
+    if is_compiled_font(path):
+        glyphs = CompiledFont(path)
+        return Font(path, mtime, glyphs.height, glyphs.width, glyphs)
+    height, width, glyphs = parse_json_font(path) if path.endswith(".json") else parse_text_font(path)
+    glyphs.setdefault(' ', [' ' * width for _ in range(height)])
+    return Font(path, mtime, height, width, glyphs)
+
+
+def _close(font: Font) -> None:
+    # A compiled font keeps its file mapped until it is closed
+    if isinstance(font.glyphs, CompiledFont):
+        font.glyphs.close()
+
+
+
+class FontRegistry:
+    # Keeps every parsed font, keyed by path and modification time, so any number of fonts can be used at once
+    # and switching between them costs nothing. Safe to share between threads
+    def __init__(self, check_interval: float = 1.0) -> None:
+        self.check_interval = check_interval # How often (seconds) a font file is checked for changes
+        self._lock = threading.Lock()
+        self._fonts: dict[str, Font] = {}
+        self._checked: dict[str, float] = {}
+        self._aliases: dict[str, str] = {}
+
+    def register(self, name: str, filename: str) -> Font:
+        with self._lock:
+            self._aliases[name] = os.path.abspath(filename)
+        return self.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._aliases)
+
+    def get(self, name: str) -> Font:
+        # name is either a registered alias or a path to a font file
+        path = self._aliases.get(name) or os.path.abspath(name)
+        font = self._fonts.get(path)
+        now = time.monotonic()
+        if font is not None and now - self._checked.get(path, 0.0) < self.check_interval:
+            return font
+        mtime = os.stat(path).st_mtime_ns
+        if font is None or font.mtime != mtime:
+            with self._lock:
+                font = self._fonts.get(path)
+                if font is None or font.mtime != mtime: # Another thread may have loaded it meanwhile
+                    # The old version is not closed, other threads may still be drawing with it.
+                    # A compiled one is unmapped when the last of them lets go of it
+                    font = _load(path, mtime)
+                    self._fonts[path] = font
+        self._checked[path] = now
+        return font
+
+    def clear(self) -> None:
+        # Closes the compiled fonts, so Font objects got from the registry must not be used after it
+        with self._lock:
+            for font in self._fonts.values():
+                _close(font)
+            self._fonts.clear()
+            self._checked.clear()
+
+
+registry = FontRegistry()
@@ -0,0 +1,107 @@
+from typing import Iterable, Iterator, TextIO
+import sys
+
+PLACING = "\033[{};{}H"
+
+Cell = tuple[str, str | None] # (character, SGR escape to draw it with or None to keep the current one)
+
+
+class _Row:
+    # Cells of one terminal row, starting at column `start`. Unused cells are None
+    __slots__ = ("start", "chars", "styles")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.chars: list[str | None] = []
+        self.styles: list[str | None] = []
+
+    def put(self, column: int, text: str, style: str | None) -> None:
+        if column == self.start + len(self.chars): # Next glyph of the same text, the usual case
+            self.chars.extend(text)
+            self.styles.extend([style] * len(text))
+            return
+        if column < self.start:
+            padding = self.start - column
+            self.chars[:0] = [None] * padding
+            self.styles[:0] = [None] * padding
+            self.start = column
+        offset = column - self.start
+        end = offset + len(text)
+        if end > len(self.chars):
+            self.chars.extend([None] * (end - len(self.chars)))
+            self.styles.extend([None] * (end - len(self.styles)))
+        self.chars[offset:end] = text
+        self.styles[offset:end] = [style] * len(text)
+
+    def runs(self) -> Iterator[tuple[int, str, str | None]]:
+        # Yields (column, text, style) for every run of adjacent cells that share a style
+        chars, styles = self.chars, self.styles
+        if None not in chars and styles.count(styles[0]) == len(styles):
+            yield self.start, "".join(chars), styles[0] # Fast path: one solid run, which is what glyph text usually is
+            return
+        run_start = None
+        for index, char in enumerate(chars + [None]):
+            if run_start is not None and (char is None or styles[index] != styles[run_start]):
+                yield self.start + run_start, "".join(chars[run_start:index]), styles[run_start]
+                run_start = None
+            if run_start is None and char is not None:
+                run_start = index
+
+
+
+def render_runs(runs: Iterable[tuple[int, int, str, str | None]], end: str = "") -> str:
+    # runs are (row, column, text, style) sorted by position. Cursor jumps are emitted only when a run
+    # does not start right after the previous one, colors only when they change
+    parts = []
+    cursor = None
+    current_style = None
+    for row, column, text, style in runs:
+        if cursor != (row, column):
+            parts.append(PLACING.format(row + 1, column + 1))
+        if style is not None and style != current_style:
+            parts.append(style)
+            current_style = style
+        parts.append(text)
+        cursor = (row, column + len(text))
+    parts.append(end)
+    return "".join(parts)
+
+
+
+class FrameBuffer:
+    # In-memory grid of cells. Text is composed here first and then written to the terminal with a single write
+    def __init__(self) -> None:
+        self._rows: dict[int, _Row] = {}
+
+    def __len__(self) -> int:
+        return sum(len(row.chars) - row.chars.count(None) for row in self._rows.values())
+
+    def clear(self) -> None:
+        self._rows.clear()
+
+    def draw(self, row: int, column: int, lines: list[str] | tuple[str, ...], style: str | None = None) -> None:
+        # row and column are 0-based, the upper left cell of the terminal is (0, 0)
+        for line_num, line in enumerate(lines):
+            if not line:
+                continue
+            target = self._rows.get(row + line_num)
+            if target is None:
+                target = self._rows[row + line_num] = _Row(column)
+            target.put(column, line, style)
+
+    def cells(self) -> Iterator[tuple[tuple[int, int], Cell]]:
+        for row_num in sorted(self._rows):
+            row = self._rows[row_num]
+            for offset, (char, style) in enumerate(zip(row.chars, row.styles)):
+                if char is not None:
+                    yield (row_num, row.start + offset), (char, style)
+
+    def render(self, end: str = "") -> str:
+        return render_runs(((row_num, column, text, style) for row_num in sorted(self._rows)
+                            for column, text, style in self._rows[row_num].runs()), end)
+
+    def flush(self, stream: TextIO | None = None, end: str = "") -> None:
+        stream = stream or sys.stdout
+        stream.write(self.render(end))
+        stream.flush()
+        self._rows.clear()
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Hashable
+import threading
+
+Glyph = str | tuple[str, ...] # Rendered ANSI string or plain rendered rows
+
+MOVE_LEFT = "\033[{}D"
+MOVE_DOWN = "\033[B"
+MOVE_UP = "\033[{}A"
+MOVE_RIGHT = "\033[{}C"
+
+
+def render_glyph(rows: list[str], symbol: str, prefix: str, width: int) -> str:
+    # Builds the whole glyph as one string with relative cursor moves, so it does not depend on the position
+    # it is drawn at. It starts at the top left corner and leaves the cursor at the top left corner of the next glyph
+    rendered = [row.rstrip("\n").replace("*", symbol) for row in rows]
+    parts = [prefix]
+    for row_num, row in enumerate(rendered):
+        if row_num:
+            parts.append(MOVE_LEFT.format(len(rendered[row_num - 1])) + MOVE_DOWN if rendered[row_num - 1] else MOVE_DOWN)
+        parts.append(row)
+    if len(rendered) > 1:
+        parts.append(MOVE_UP.format(len(rendered) - 1))
+    if rendered and len(rendered[-1]) != width:
+        # A symbol longer than one character makes rows wider than the glyph, next glyph still starts `width` cells later
+        shift = len(rendered[-1]) - width
+        parts.append(MOVE_LEFT.format(shift) if shift > 0 else MOVE_RIGHT.format(-shift))
+    return "".join(parts)
+
+
+
+class GlyphCache:
+    # LRU cache of rendered glyphs, keyed by (font, char, symbol, color, background color)
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be positive")
+        self.maxsize = maxsize
+        self._glyphs: OrderedDict[Hashable, Glyph] = OrderedDict()
+        self._lock = threading.Lock() # Printers can be used from several threads
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Glyph | None:
+        with self._lock:
+            glyph = self._glyphs.get(key)
+            if glyph is None:
+                self.misses += 1
+                return None
+            self._glyphs.move_to_end(key)
+            self.hits += 1
+            return glyph
+
+    def put(self, key: Hashable, glyph: Glyph) -> None:
+        with self._lock:
+            self._glyphs[key] = glyph
+            self._glyphs.move_to_end(key)
+            if len(self._glyphs) > self.maxsize:
+                self._glyphs.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._glyphs.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._glyphs)
+
+    def info(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._glyphs), "maxsize": self.maxsize}
@@ -1,5 +1,11 @@
 from enum import Enum
-from typing import Self
+from typing import Self, TextIO
+import sys
+from glyph_cache import GlyphCache, render_glyph
+from frame_buffer import FrameBuffer
+from screen import Screen
+from font_registry import Font, registry
+from render_queue import RenderQueue
 
 COLORING = "\033[{}m{}"
 PLACING = "\033[{};{}H{}"
@@ -19,90 +25,148 @@ class Color(Enum):
 
     
 class Printer:
-    _font: dict[str, list[str]] = {}
-    _char_width: int = 5
-    _char_height: int = 5
+    _default_font: str | None = None # Font file used by printers that were not given a font of their own
+    _glyph_cache = GlyphCache(maxsize=1024)
+    buffered: bool = False # Frame buffer mode: the whole text is composed in memory and written with one sys.stdout.write
+    screen: Screen | None = None # Retained mode: only cells that changed since the last draw are written, implies frame buffer mode
+    queue: RenderQueue | None = None # Asynchronous mode: drawing is handed to the queue's thread instead of writing to stdout
 
-    def __init__(self, color: Color, position: tuple[int, int], symbol: str) -> None:
+    def __init__(self, color: Color, position: tuple[int, int], symbol: str, font: str | None = None) -> None:
         self.color = color
+        self.font = font # Registered font name or font file path
         self.symbol = symbol
         self.current_x, self.current_y = position
 
 
     @classmethod
     def load_font(cls, filename: str = "font.txt") -> None:
+        # Fonts are parsed once and kept in the registry, loading one again only checks the file for changes
         try:
-            with open(filename, "r") as file:
-                cls._font.clear()
-                cls._char_height = int(file.readline().strip())
-                cls._char_width = int(file.readline().strip())
-                cls._font[' '] = [' '*cls._char_width for _ in range(cls._char_height)]
-                while True:
-                    char = file.readline().replace('-', '').strip()
-                    if char == '':
-                        break
-                    cls._font[char] = []
-                    for _ in range(cls._char_height):
-                        line = file.readline()[:cls._char_width]
-                        if '-' in line:
-                            raise ValueError(f"Font file is not valid, character height is not consistent. List of correct characters: {cls._font.keys()}")
-                        cls._font[char].append(line)
+            registry.get(filename)
+            cls._default_font = filename # The registry is asked every time, so edits and reloads are picked up
         except Exception as e:
             print(f"Error loading font file: {e}")
             raise FileNotFoundError
-        
+
 
     @classmethod
-    def print_(cls, text: str, color: Color, position: tuple[int, int], symbol: str) -> None:
-        if not cls._font:
+    def _get_font(cls, name: str | None) -> Font:
+        if name is not None:
+            return registry.get(name)
+        if cls._default_font is None:
             cls.load_font()
-        
+        return registry.get(cls._default_font)
+
+
+    @classmethod
+    def _glyph(cls, font: Font, char: str, symbol: str, color: Color | None = None) -> str:
+        # Rendered glyphs are cached, so repeated text only copies strings
+        key = (font.key, char, symbol, color)
+        glyph = cls._glyph_cache.get(key)
+        if glyph is None:
+            prefix = COLORING.format(color.value, '') if color else ''
+            glyph = render_glyph(font.glyphs[char], symbol, prefix, font.width)
+            cls._glyph_cache.put(key, glyph)
+        return glyph
+
+
+    @classmethod
+    def _glyph_rows(cls, font: Font, char: str, symbol: str) -> tuple[str, ...]:
+        key = (font.key, char, symbol)
+        rows = cls._glyph_cache.get(key)
+        if rows is None:
+            rows = tuple(line.rstrip("\n").replace("*", symbol) for line in font.glyphs[char])
+            cls._glyph_cache.put(key, rows)
+        return rows
+
+
+    @classmethod
+    def print_(cls, text: str, color: Color, position: tuple[int, int], symbol: str, font: str | None = None) -> None:
+        font = cls._get_font(font)
+        if cls.queue is not None:
+            missing = [char for char in text if char not in font.glyphs]
+            if missing:
+                raise ValueError(f"Character {missing[0]} is not in the font file")
+            # A newer text at the same position replaces a queued one that was not drawn yet
+            cls.queue.submit(("print_", position), lambda stream: cls._draw_(stream, text, color, position, symbol, font))
+            return
+        cls._draw_(sys.stdout, text, color, position, symbol, font)
+
+
+    @classmethod
+    def _draw_(cls, stream: TextIO, text: str, color: Color, position: tuple[int, int], symbol: str, font: Font) -> None:
         x, y = position
+        frame = FrameBuffer() if cls.buffered or cls.screen is not None else None
         for char in text:
-            if char not in cls._font:
+            if char not in font.glyphs:
                 raise ValueError(f"Character {char} is not in the font file")
             
-            for line_num, line in enumerate(cls._font[char]):
-                rendered = line.replace("*", symbol)
-                print(PLACING.format(y + line_num + 1, x + 1, COLORING.format(color.value, rendered)), end="")
-            
-            x += cls._char_width
-        print()
+            if frame is not None:
+                frame.draw(y, x, cls._glyph_rows(font, char, symbol), COLORING.format(color.value, ''))
+            else:
+                stream.write(PLACING.format(y + 1, x + 1, cls._glyph(font, char, symbol, color)))
+            x += font.width
+        if cls.screen is not None:
+            cls.screen.flush(frame, stream, end="\n")
+        elif frame is not None:
+            frame.flush(stream, end="\n")
+        else:
+            stream.write("\n")
 
 
     def __enter__(self) -> Self:
-        print(COLORING.format(self.color.value, ''), end="") 
+        self._write(COLORING.format(self.color.value, ''))
         return self
 
 
     def __exit__(self, *args) -> None:
-        print(COLORING.format(Color.TRANSPARENT.value, ''), end="")
+        self._write(COLORING.format(Color.TRANSPARENT.value, ''))
+
+
+    def _write(self, text: str) -> None:
+        # In asynchronous mode color changes go through the queue too, so they stay in order with the text
+        if self.queue is not None:
+            self.queue.submit_control(lambda stream: stream.write(text))
+        else:
+            print(text, end="")
 
 
     def print(self, text: str) -> None:
-        if not self._font:
-            self.load_font()
+        font = self._get_font(self.font)
         x, y = self.current_x, self.current_y
+        if self.queue is not None:
+            self.queue.submit((id(self), x, y), lambda stream: self._draw(stream, text, x, y, font))
+            self.current_x = x + font.width * sum(char in font.glyphs for char in text)
+            return
+        self.current_x = self._draw(sys.stdout, text, x, y, font)
+
+
+    def _draw(self, stream: TextIO, text: str, x: int, y: int, font: Font) -> int:
+        frame = FrameBuffer() if self.buffered or self.screen is not None else None
         for char in text:
-            if char not in self._font:
+            if char not in font.glyphs:
                 continue
             
-            for line_num, line in enumerate(self._font[char]):
-                rendered = line.replace("*", self.symbol)
-                # print(f"\033[{y + line_num + 1};{x + 1}H{rendered}", end="")
-                print(PLACING.format(y + line_num + 1, x + 1, rendered), end="")
-            
-            x += self._char_width
-        self.current_x = x
+            if frame is not None:
+                # The color is given explicitly, so cells drawn by different printers can be told apart
+                frame.draw(y, x, self._glyph_rows(font, char, self.symbol), COLORING.format(self.color.value, ''))
+            else:
+                stream.write(PLACING.format(y + 1, x + 1, self._glyph(font, char, self.symbol)))
+            x += font.width
+        if self.screen is not None:
+            self.screen.flush(frame, stream)
+        elif frame is not None:
+            frame.flush(stream)
+        return x
 
 
 
 if __name__ == "__main__":
     for _ in range(30):
         print()
-    Printer.load_font(filename="font5.txt")
-    Printer.print_("AB", Color.RED, (5, 2), "#")
-    Printer.load_font(filename="font7.txt")
-    with Printer(Color.GREEN, (0, 10), "@") as printer:
+    registry.register("small", "font5.txt")
+    registry.register("big", "font7.txt")
+    Printer.print_("AB", Color.RED, (5, 2), "#", font="small")
+    with Printer(Color.GREEN, (0, 10), "@", font="big") as printer:
         printer.print("OOP LABS ARE COOL")
         printer.print(" AB")
\ No newline at end of file
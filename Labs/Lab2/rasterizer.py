@@ -0,0 +1,87 @@
+from typing import Iterable, Literal
+from font_registry import Font, registry
+from glyph_cache import GlyphCache
+
+Kind = Literal["lines", "bitmap", "pbm"]
+_BITS_TO_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class Rasterizer:
+    # Composes text with the Printer fonts in memory instead of on a terminal: as lines of text, as a bitmap with
+    # one byte (0 or 1) per pixel, as a NumPy array or as a binary PBM image. Every glyph is converted once and cached,
+    # after that a label is only a join of the cached rows
+    _glyph_cache = GlyphCache(maxsize=1024)
+
+    def __init__(self, font: str, symbol: str = "*") -> None:
+        self.font = font # Registered font name or font file path
+        self.symbol = symbol
+
+    def _glyphs(self, font: Font, text: str, batch: dict | None = None) -> list[tuple[tuple[str, ...], tuple[bytes, ...], tuple[str, ...]]]:
+        # batch keeps the glyphs already used by the current rasterize_all call, so the shared cache is asked once per character
+        glyphs = []
+        for char in text:
+            if batch is not None and char in batch:
+                glyphs.append(batch[char])
+                continue
+            key = (font.key, char, self.symbol)
+            glyph = self._glyph_cache.get(key)
+            if glyph is None:
+                if char not in font.glyphs:
+                    raise ValueError(f"Character {char} is not in the font file")
+                rows = font.glyphs[char]
+                bits = tuple("".join('0' if pixel == ' ' else '1' for pixel in row) for row in rows)
+                glyph = (tuple(row.replace("*", self.symbol) for row in rows),
+                         tuple(row.encode().translate(_BITS_TO_BYTES) for row in bits),
+                         bits)
+                self._glyph_cache.put(key, glyph)
+            if batch is not None:
+                batch[char] = glyph
+            glyphs.append(glyph)
+        return glyphs
+
+    def size(self, text: str) -> tuple[int, int]:
+        # (height, width) in pixels
+        font = registry.get(self.font)
+        return font.height, font.width * len(text)
+
+    def lines(self, text: str) -> list[str]:
+        return self._lines(registry.get(self.font), text)
+
+    def bitmap(self, text: str) -> bytes:
+        # Rows one after another, size() gives the shape
+        return self._bitmap(registry.get(self.font), text)
+
+    def array(self, text: str):
+        import numpy # ImportError here means NumPy is not installed, bitmap() needs nothing
+        font = registry.get(self.font)
+        return numpy.frombuffer(self._bitmap(font, text), dtype=numpy.uint8).reshape(font.height, font.width * len(text))
+
+    def pbm(self, text: str) -> bytes:
+        # Binary PBM (P4): header, then every row packed 8 pixels per byte, most significant bit first
+        return self._pbm(registry.get(self.font), text)
+
+    def rasterize_all(self, labels: Iterable[str], kind: Kind = "bitmap") -> list:
+        # The font is looked up once for the whole batch
+        font = registry.get(self.font)
+        render = {"lines": self._lines, "bitmap": self._bitmap, "pbm": self._pbm}[kind]
+        batch = {}
+        return [render(font, label, batch) for label in labels]
+
+    def _lines(self, font: Font, text: str, batch: dict | None = None) -> list[str]:
+        glyphs = [glyph[0] for glyph in self._glyphs(font, text, batch)]
+        return ["".join(glyph[row] for glyph in glyphs) for row in range(font.height)]
+
+    def _bitmap(self, font: Font, text: str, batch: dict | None = None) -> bytes:
+        glyphs = [glyph[1] for glyph in self._glyphs(font, text, batch)]
+        return b"".join([row_bytes for row in range(font.height) for row_bytes in (glyph[row] for glyph in glyphs)])
+
+    def _pbm(self, font: Font, text: str, batch: dict | None = None) -> bytes:
+        glyphs = [glyph[2] for glyph in self._glyphs(font, text, batch)]
+        width = font.width * len(text)
+        row_size = (width + 7) // 8
+        rows = []
+        for row in range(font.height):
+            bits = "".join(glyph[row] for glyph in glyphs).ljust(row_size * 8, '0')
+            rows.append(int(bits, 2).to_bytes(row_size, "big") if bits else b"")
+        return f"P4\n{width} {font.height}\n".encode() + b"".join(rows)
+
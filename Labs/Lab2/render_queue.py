@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Self, TextIO
+import io, itertools, sys, threading, time
+
+Job = Callable[[TextIO], None] # Draws something into the given stream
+
+POLICIES = ("drop_oldest", "drop_new", "block")
+
+
+class RenderQueue:
+    # Pending drawing jobs keyed by the screen region they paint. A background thread takes everything that is
+    # pending, renders it into memory and writes it to the terminal with one write, so callers never wait for the terminal.
+    # A job for a region that already has a pending job replaces it in place: only the latest text is drawn
+    # and it keeps the place of the old one, so it is still drawn after anything that was queued before it
+    def __init__(self, maxsize: int = 256, policy: str = "drop_oldest", interval: float = 0.02, stream: TextIO | None = None) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy}, expected one of {POLICIES}")
+        self.maxsize = maxsize
+        self.policy = policy # What happens when the queue is full: drop the oldest region, drop the new job or wait for room
+        self.interval = interval # Pause between two writes (seconds), updates arriving meanwhile are coalesced
+        self.stream = stream
+        self._pending: OrderedDict[Hashable, tuple[Job, bool]] = OrderedDict()
+        self._control_keys = itertools.count()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.writes = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name="render-queue", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def submit(self, region: Hashable, job: Job) -> bool:
+        # Returns False when the job was dropped because the queue is full
+        return self._put(region, job, control=False)
+
+    def submit_control(self, job: Job) -> None:
+        # Color changes and other state the following jobs depend on: never coalesced or dropped
+        self._put(("control", next(self._control_keys)), job, control=True)
+
+    def _put(self, key: Hashable, job: Job, control: bool) -> bool:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Render queue is closed")
+            self.submitted += 1
+            if key in self._pending:
+                self._pending[key] = (job, control)
+                self.coalesced += 1
+                return True
+            if not control and len(self._pending) >= self.maxsize:
+                if self.policy == "drop_new":
+                    self.dropped += 1
+                    return False
+                if self.policy == "block":
+                    self._condition.wait_for(lambda: len(self._pending) < self.maxsize or self._closed)
+                    if self._closed:
+                        raise RuntimeError("Render queue is closed")
+                else:
+                    oldest = next((key for key, (_, is_control) in self._pending.items() if not is_control), None)
+                    if oldest is not None:
+                        del self._pending[oldest]
+                        self.dropped += 1
+            self._pending[key] = (job, control)
+            self._condition.notify_all()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                jobs = [job for job, _ in self._pending.values()]
+                self._pending.clear()
+                self._busy = True
+                self._condition.notify_all()
+            buffer = io.StringIO()
+            for job in jobs:
+                try:
+                    job(buffer)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Render error: {e}", file=sys.stderr)
+            stream = self.stream or sys.stdout
+            try:
+                stream.write(buffer.getvalue())
+                stream.flush()
+                self.writes += 1
+            except (OSError, ValueError) as e: # Closed pipe or terminal, the frame is lost but the queue keeps going
+                self.errors += 1
+                print(f"Render error: {e}", file=sys.stderr)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+            if self.interval:
+                time.sleep(self.interval)
+
+    def join(self, timeout: float | None = None) -> bool:
+        # Waits until everything submitted so far is on the terminal
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, drain: bool = True) -> None:
+        with self._condition:
+            if not drain:
+                self.dropped += sum(not control for _, control in self._pending.values())
+                self._pending = OrderedDict((key, value) for key, value in self._pending.items() if value[1])
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def info(self) -> dict[str, int]:
+        return {"submitted": self.submitted, "coalesced": self.coalesced, "dropped": self.dropped,
+                "writes": self.writes, "errors": self.errors, "pending": len(self._pending)}
@@ -0,0 +1,39 @@
+from typing import TextIO
+import sys
+from frame_buffer import Cell, FrameBuffer, render_runs
+
+
+class Screen:
+    # Retained model of the terminal: remembers what was last drawn in every cell, so a new frame
+    # only writes the cells whose character or color changed. One screen can be shared by any number of printers
+    def __init__(self) -> None:
+        self._cells: dict[tuple[int, int], Cell] = {}
+        self.cells_written = 0
+        self.cells_skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def get(self, row: int, column: int) -> Cell | None:
+        return self._cells.get((row, column))
+
+    def invalidate(self) -> None:
+        # Call after anything else has drawn over the terminal (clear, resize, plain print), everything is redrawn next time
+        self._cells.clear()
+
+    def flush(self, frame: FrameBuffer, stream: TextIO | None = None, end: str = "") -> int:
+        cells = self._cells
+        runs = []
+        for position, cell in frame.cells():
+            if cells.get(position) == cell:
+                self.cells_skipped += 1
+                continue
+            cells[position] = cell
+            runs.append((position[0], position[1], cell[0], cell[1]))
+        frame.clear()
+        self.cells_written += len(runs)
+        if runs or end:
+            stream = stream or sys.stdout
+            stream.write(render_runs(runs, end))
+            stream.flush()
+        return len(runs)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Protocol
-import socket, re
+from typing import Protocol, Self
+import socket, re, time
 from datetime import datetime
 
 
@@ -36,6 +36,26 @@ class LogHandlerProtocol(Protocol):
         ...
 
 
+_second: tuple[int, str] = (0, '')
+
+
+def timestamp() -> str:
+    # Same text as datetime.now().isoformat(), but the date and time part is formatted once per second
+    global _second
+    now = time.time()
+    second = int(now)
+    cached_second, text = _second
+    if second != cached_second:
+        text = datetime.fromtimestamp(second).isoformat()
+        _second = (second, text)
+    return f'{text}.{int((now - second) * 1_000_000):06d}'
+
+
+def format_line(message: str) -> str:
+    # The line every handler writes for a message
+    return f'{timestamp()}: \t {message}\n'
+
+
 class FileHandler(LogHandlerProtocol):
     def __init__(self, filepath: str) -> None:
         self.filepath = filepath
@@ -43,7 +63,7 @@ class FileHandler(LogHandlerProtocol):
     def handle(self, message: str) -> None:
         try:
             with open(self.filepath, 'a') as file:
-                file.write(f'{datetime.now().isoformat()}: \t {message}\n')
+                file.write(format_line(message))
         except Exception as e:
             print(f'File error: {e}')
 
@@ -57,7 +77,7 @@ class SocketHandler(LogHandlerProtocol):
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                 sock.connect((self.host, self.port))
-                sock.sendall(f'{str(datetime.now().isoformat())}: \t {message}\n'.encode('utf-8'))
+                sock.sendall(format_line(message).encode('utf-8'))
         except Exception as e:
             print(f'Socket error: {e}')
 
@@ -83,6 +103,20 @@ class Logger:
             for handler in self.handlers:
                 handler.handle(message)
 
+    def close(self) -> None:
+        # Handlers that buffer messages or keep a connection open have a close() that flushes them.
+        # Filters can have one too (DuplicateFilter reports what it suppressed), they are closed first
+        for item in [*self.filters, *self.handlers]:
+            close = getattr(item, 'close', None)
+            if close is not None:
+                close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
 
                 
 
@@ -0,0 +1,198 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Protocol, Self, TextIO
+import asyncio
+from Lab3 import LogFilterProtocol, format_line
+
+
+class AsyncLogHandlerProtocol(Protocol):
+    async def handle(self, message: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+
+class _BatchingHandler(ABC):
+    # Lines are collected in memory and written by one background task of the running event loop,
+    # when batch_size bytes are waiting or every flush_interval seconds. max_pending lines at most, the rest is dropped
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self._lines: list[str] = []
+        self._size = 0
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._closed = False
+
+    async def handle(self, message: str) -> None:
+        if self._closed or len(self._lines) >= self.max_pending:
+            self.dropped += 1
+            return
+        if self._task is None: # Created here, the handler itself can be made outside of the event loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+        line = format_line(message)
+        self._lines.append(line)
+        self._size += len(line)
+        if self._size >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        if self._flush_lock is None: # Nothing was handled yet
+            return
+        # One flush at a time, so batches are written in the order they were taken
+        async with self._flush_lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        lines, self._lines, self._size = self._lines, [], 0
+        if lines and not await self._write(lines):
+            # Back in front of the lines handled meanwhile, the oldest are dropped if there is no room
+            lines += self._lines
+            overflow = len(lines) - self.max_pending
+            if overflow > 0:
+                self.dropped += overflow
+                lines = lines[overflow:]
+            self._lines = lines
+            self._size = sum(len(line) for line in lines)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+        self.dropped += len(self._lines)
+        self._lines.clear()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    @abstractmethod
+    async def _write(self, lines: list[str]) -> bool:
+        ...
+
+
+
+class AsyncSocketHandler(_BatchingHandler):
+    # Keeps one connection open (asyncio.open_connection) and sends the waiting lines with one write. A lost
+    # connection is opened again, backoff seconds after a failed attempt, twice as long after every next one
+    def __init__(self, host: str, port: int, batch_size: int = 64 * 1024, flush_interval: float = 0.1,
+                 max_pending: int = 100_000, backoff: float = 0.5, max_backoff: float = 30.0, timeout: float = 5.0) -> None:
+        super().__init__(batch_size, flush_interval, max_pending)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connections = 0
+        self._writer: asyncio.StreamWriter | None = None
+        self._delay = backoff
+        self._retry_at = 0.0
+
+    async def _write(self, lines: list[str]) -> bool:
+        loop = asyncio.get_running_loop()
+        if self._writer is None:
+            if loop.time() < self._retry_at and not self._closed:
+                return False
+            try:
+                _, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                print(f'Socket error: {str(e) or "connection timed out"}')
+                self._retry_at = loop.time() + self._delay
+                self._delay = min(self._delay * 2, self.max_backoff)
+                return False
+            self._delay = self.backoff
+            self.connections += 1
+        try:
+            self._writer.write(''.join(lines).encode('utf-8'))
+            await asyncio.wait_for(self._writer.drain(), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f'Socket error: {str(e) or "send timed out"}')
+            self._writer.close()
+            self._writer = None
+            return False
+        self.written += len(lines)
+        self.batches += 1
+        return True
+
+    async def close(self) -> None:
+        await super().close()
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._writer = None
+
+
+
+class AsyncFileHandler(_BatchingHandler):
+    # The file is opened and written in an executor (the default one if none is given), so the event loop never
+    # waits for the disk. Batches are written one after another, in order
+    def __init__(self, filepath: str, batch_size: int = 64 * 1024, flush_interval: float = 0.1,
+                 max_pending: int = 100_000, executor: Executor | None = None) -> None:
+        super().__init__(batch_size, flush_interval, max_pending)
+        self.filepath = filepath
+        self.executor = executor
+        self._file: TextIO | None = None
+
+    def _append(self, text: str) -> None:
+        if self._file is None:
+            self._file = open(self.filepath, 'a', encoding='utf-8')
+        self._file.write(text)
+        self._file.flush()
+
+    async def _write(self, lines: list[str]) -> bool:
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._append, ''.join(lines))
+        except Exception as e:
+            print(f'File error: {e}')
+            return False
+        self.written += len(lines)
+        self.batches += 1
+        return True
+
+    async def close(self) -> None:
+        await super().close()
+        if self._file is not None:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._file.close)
+            self._file = None
+
+
+
+class AsyncLogger:
+    # Logger for asyncio code: the same filters, handlers that never block the event loop
+    def __init__(self, handlers: list[AsyncLogHandlerProtocol], filters: list[LogFilterProtocol]) -> None:
+        self.handlers = handlers
+        self.filters = filters
+
+    async def write(self, message: str) -> None:
+        if all(filter_cls.match(message) for filter_cls in self.filters):
+            for handler in self.handlers:
+                await handler.handle(message)
+
+    async def close(self) -> None:
+        for handler in self.handlers:
+            await handler.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,139 @@
+import socket, threading, time
+from Lab3 import LogHandlerProtocol, format_line
+
+
+class BatchingSocketHandler(LogHandlerProtocol):
+    # Keeps one connection open and sends messages in batches from a background thread: a batch goes out
+    # when batch_size bytes are waiting or every flush_interval seconds. If the connection is lost it is opened
+    # again, waiting backoff seconds after a failed attempt and twice as long after every next one, up to max_backoff.
+    # Messages wait in memory meanwhile, up to max_pending of them, the ones that do not fit are dropped and counted
+    def __init__(self, host: str, port: int, batch_size: int = 64 * 1024, flush_interval: float = 0.5,
+                 max_pending: int = 100_000, backoff: float = 0.5, max_backoff: float = 30.0, timeout: float = 5.0) -> None:
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.connections = 0
+        self._lines: list[bytes] = []
+        self._size = 0
+        self._sock: socket.socket | None = None
+        self._delay = backoff
+        self._retry_at = 0.0
+        self._flushing = False
+        self._sending = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f'socket-handler-{host}:{port}', daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._lines)
+
+    def handle(self, message: str) -> None:
+        data = self.encode(message)
+        with self._condition:
+            if self._closed or len(self._lines) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._lines.append(data)
+            self._size += len(data)
+            if self._size >= self.batch_size:
+                self._condition.notify_all()
+
+    def encode(self, message: str) -> bytes:
+        return format_line(message).encode('utf-8')
+
+    def flush(self, timeout: float | None = None) -> bool:
+        # Sends everything handled so far, returns False if it could not be sent in time (no connection)
+        timeout = self.timeout if timeout is None else timeout
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._lines and not self._sending, timeout)
+
+    def close(self) -> None:
+        # Makes one last attempt to send what is waiting, whatever is still not sent then counts as dropped
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._sock is None and time.monotonic() < self._retry_at and not self._closed:
+                    self._condition.wait_for(lambda: self._closed, self._retry_at - time.monotonic())
+                else:
+                    self._condition.wait_for(lambda: self._size >= self.batch_size or self._flushing or self._closed,
+                                             self.flush_interval)
+                closing = self._closed
+                lines, self._lines, self._size = self._lines, [], 0
+                self._flushing = False
+                self._sending = bool(lines)
+            sent = not lines or self._send(lines, force=closing)
+            with self._condition:
+                if not sent:
+                    if closing:
+                        self.dropped += len(lines)
+                    else:
+                        self._requeue(lines)
+                self._sending = False
+                self._condition.notify_all()
+            if closing:
+                self._disconnect()
+                return
+
+    def _requeue(self, lines: list[bytes]) -> None:
+        # Lines that could not be sent go back in front of the ones handled meanwhile, the oldest are dropped if there is no room
+        lines = lines + self._lines
+        overflow = len(lines) - self.max_pending
+        if overflow > 0:
+            self.dropped += overflow
+            lines = lines[overflow:]
+        self._lines = lines
+        self._size = sum(len(line) for line in lines)
+
+    def _send(self, lines: list[bytes], force: bool = False) -> bool:
+        if self._sock is None:
+            if not force and time.monotonic() < self._retry_at:
+                return False
+            try:
+                self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except OSError as e:
+                print(f'Socket error: {e}')
+                self._retry_at = time.monotonic() + self._delay
+                self._delay = min(self._delay * 2, self.max_backoff)
+                return False
+            self._delay = self.backoff
+            self.connections += 1
+        try:
+            self._sock.sendall(b''.join(lines))
+        except OSError as e:
+            # Part of the batch may have been received, it is sent again as a whole after reconnecting
+            print(f'Socket error: {e}')
+            self._disconnect()
+            return False
+        self.sent += len(lines)
+        self.batches += 1
+        return True
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def info(self) -> dict[str, int]:
+        return {'sent': self.sent, 'batches': self.batches, 'dropped': self.dropped,
+                'pending': len(self._lines), 'connections': self.connections}
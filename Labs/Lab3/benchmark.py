@@ -0,0 +1,153 @@
+from time import perf_counter
+import asyncio, os, random, sys, tempfile
+from Lab3 import FileHandler, Logger, ReLogFilter, SimpleLogFilter
+from buffered_file_handler import BufferedFileHandler
+from queue_handler import LogQueue, QueueHandler, QueueListener
+from filter_compiler import AllOf, AnyOf, CompiledFilter
+from async_logger import AsyncFileHandler, AsyncLogger, AsyncSocketHandler
+
+
+def _throughput(logger: Logger, messages: int) -> float:
+    start = perf_counter()
+    for number in range(messages):
+        logger.write(f'ERROR 404: Resource not found #{number}')
+    logger.close()
+    return messages / (perf_counter() - start)
+
+
+def bench_file(messages: int = 100_000) -> None:
+    # Messages per second written to a file, including the final flush
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.log')
+        for name, handler in (('FileHandler', lambda: FileHandler(path)),
+                              ('BufferedFileHandler', lambda: BufferedFileHandler(path))):
+            rate = _throughput(Logger([handler()], []), messages)
+            print(f'{name:<22} {rate:12.0f} msgs/s   {os.path.getsize(path):10} bytes')
+            os.remove(path)
+
+
+def bench_queue(messages: int = 100_000) -> None:
+    # How long Logger.write keeps the caller busy with FileHandler called directly and behind a queue
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.log')
+        queue = LogQueue(maxsize=messages)
+        listener = QueueListener(queue, [FileHandler(path)])
+        for name, logger in (('direct', Logger([FileHandler(path)], [])),
+                             ('queue', Logger([QueueHandler(queue)], []))):
+            start = perf_counter()
+            for number in range(messages):
+                logger.write(f'ERROR 404: Resource not found #{number}')
+            written = perf_counter() - start
+            logger.close()
+            print(f'{name:<8} {messages / written:12.0f} msgs/s in write()   {messages / (perf_counter() - start):12.0f} msgs/s until on disk')
+        listener.stop()
+        for handler, stats in listener.metrics().items():
+            print(f'  {handler:<16} {stats}')
+
+
+def _word(rng: random.Random) -> str:
+    return ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(4, 8)))
+
+
+def bench_filters(messages: int = 20_000) -> None:
+    # A block list (any of the patterns) and an allow list (every one of a few patterns and a regex) with a growing
+    # number of substring patterns and regexes, evaluated filter by filter and compiled
+    rng = random.Random(0)
+    lines = [f'ERROR {rng.randint(100, 599)}: {_word(rng)} {_word(rng)} {_word(rng)} at {_word(rng)}' for _ in range(messages)]
+    for count in (1, 10, 100, 1000):
+        patterns = [_word(rng) for _ in range(count)]
+        regexes = [rf'{_word(rng)}\s+\d+' for _ in range(max(1, count // 10))]
+        trees = {
+            'any of': AnyOf([SimpleLogFilter(pattern) for pattern in patterns] + [ReLogFilter(regex) for regex in regexes]),
+            'all of': AllOf([SimpleLogFilter('ERROR'), AnyOf([SimpleLogFilter(pattern) for pattern in patterns]),
+                             AnyOf([ReLogFilter(regex) for regex in regexes])]),
+        }
+        for name, tree in trees.items():
+            compiled = CompiledFilter(tree)
+            timings = []
+            for filter_cls in (tree, compiled):
+                start = perf_counter()
+                matched = sum(filter_cls.match(line) for line in lines)
+                timings.append(perf_counter() - start)
+            print(f'{count:5} patterns {name:<7} {timings[0] / messages * 1e6:9.2f} us filter by filter   '
+                  f'{timings[1] / messages * 1e6:7.2f} us compiled   x{timings[0] / timings[1]:6.1f}   {matched} matched')
+
+
+class _BlockingHandler:
+    # A synchronous handler called straight from the event loop, what asyncio code does with Logger today
+    def __init__(self, handler: FileHandler) -> None:
+        self.handler = handler
+
+    async def handle(self, message: str) -> None:
+        self.handler.handle(message)
+
+    async def close(self) -> None:
+        pass
+
+
+async def _loop_latency(logger: AsyncLogger, rate: int, seconds: float) -> tuple[list[float], int]:
+    # Writes rate messages per second in bursts every 10 ms, while a probe measures how late a 1 ms sleep wakes up
+    loop = asyncio.get_running_loop()
+    delays = []
+    written = 0
+    end = loop.time() + seconds
+
+    async def probe() -> None:
+        while loop.time() < end:
+            start = loop.time()
+            await asyncio.sleep(0.001)
+            delays.append(loop.time() - start - 0.001)
+
+    probe_task = asyncio.create_task(probe())
+    tick = loop.time()
+    while loop.time() < end:
+        for _ in range(rate // 100):
+            await logger.write(f'ERROR 404: Resource not found #{written}')
+            written += 1
+        tick += 0.01
+        await asyncio.sleep(max(0.0, tick - loop.time()))
+    await probe_task
+    await logger.close()
+    return sorted(delays), written
+
+
+async def _bench_async(rate: int, seconds: float) -> None:
+    received = 0
+
+    async def collect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal received
+        while data := await reader.read(65536):
+            received += data.count(b'\n')
+
+    server = await asyncio.start_server(collect, 'localhost', 0)
+    port = server.sockets[0].getsockname()[1]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.log')
+        for name, handler in (('FileHandler', lambda: _BlockingHandler(FileHandler(path))),
+                              ('AsyncFileHandler', lambda: AsyncFileHandler(path)),
+                              ('AsyncSocketHandler', lambda: AsyncSocketHandler('localhost', port))):
+            delays, written = await _loop_latency(AsyncLogger([handler()], []), rate, seconds)
+            print(f'{name:<20} {written / seconds:8.0f} msgs/s   loop lag p50 {delays[len(delays) // 2] * 1000:6.2f} ms   '
+                  f'p99 {delays[len(delays) * 99 // 100] * 1000:6.2f} ms   max {delays[-1] * 1000:6.2f} ms')
+    server.close()
+    await server.wait_closed()
+    print(f'Collector received {received} lines')
+
+
+def bench_async(rate: int = 50_000, seconds: int = 3) -> None:
+    asyncio.run(_bench_async(rate, seconds))
+
+
+BENCHMARKS = {
+    'file': bench_file,
+    'queue': bench_queue,
+    'filters': bench_filters,
+    'async': bench_async,
+}
+
+
+if __name__ == '__main__':
+    # python benchmark.py [name] [messages]
+    name = sys.argv[1] if len(sys.argv) > 1 else 'file'
+    args = [int(arg) for arg in sys.argv[2:]]
+    BENCHMARKS[name](*args)
@@ -0,0 +1,191 @@
+from enum import IntEnum
+from typing import Iterator, NamedTuple, Self
+import bisect, mmap, os, struct, threading, time
+from Lab3 import LogHandlerProtocol
+from batching_socket_handler import BatchingSocketHandler
+
+# Log file layout: 8 byte header, then records one after another
+#   record header  payload length, timestamp (nanoseconds since the epoch), level
+#   payload        the message in UTF-8
+# The sparse index (<log file>.idx) is a header and a (timestamp, offset) entry for every index_interval-th record
+MAGIC = b'BLG1'
+INDEX_MAGIC = b'BLI1'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sHxx') # magic, version, padding
+RECORD_HEADER = struct.Struct('<IqB')
+INDEX_ENTRY = struct.Struct('<qQ')
+
+
+class Level(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    CRITICAL = 50
+
+
+def level_of(message: str) -> Level:
+    # Messages start with their level: 'ERROR 404: Resource not found', 'INFO: System started'
+    word = message[:8].split(' ', 1)[0].split(':', 1)[0]
+    return Level.__members__.get(word.upper(), Level.INFO)
+
+
+def encode_record(message: str, level: Level | None = None, timestamp_ns: int | None = None) -> bytes:
+    payload = message.encode('utf-8')
+    return RECORD_HEADER.pack(len(payload), time.time_ns() if timestamp_ns is None else timestamp_ns,
+                              level_of(message) if level is None else level) + payload
+
+
+
+class Record(NamedTuple):
+    timestamp_ns: int
+    level: int
+    payload: memoryview # Points into the mapped file, nothing is copied until message is read
+
+    @property
+    def message(self) -> str:
+        return str(self.payload, 'utf-8')
+
+
+
+class BinaryFileHandler(LogHandlerProtocol):
+    # Appends records to a binary log and every index_interval-th record to its sparse index. The file stays open
+    def __init__(self, filepath: str, index_interval: int = 1024) -> None:
+        self.filepath = filepath
+        self.index_interval = index_interval
+        self._count = 0
+        self._lock = threading.Lock()
+        try:
+            self._file = open(filepath, 'ab')
+            if self._file.tell() == 0:
+                self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self._index = open(f'{filepath}.idx', 'ab')
+            if self._index.tell() == 0:
+                self._index.write(FILE_HEADER.pack(INDEX_MAGIC, VERSION))
+        except Exception as e:
+            print(f'File error: {e}')
+            raise
+
+    def handle(self, message: str) -> None:
+        timestamp_ns = time.time_ns()
+        record = encode_record(message, timestamp_ns=timestamp_ns)
+        with self._lock:
+            try:
+                if self._count % self.index_interval == 0:
+                    self._index.write(INDEX_ENTRY.pack(timestamp_ns, self._file.tell()))
+                self._file.write(record)
+                self._count += 1
+            except Exception as e:
+                print(f'File error: {e}')
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+
+
+class BinarySocketHandler(BatchingSocketHandler):
+    # BatchingSocketHandler sending records instead of text lines, the length prefix frames them in the stream
+    def encode(self, message: str) -> bytes:
+        return encode_record(message)
+
+
+
+class BinaryLogReader:
+    # Memory-mapped binary log. Records point into the mapping, so they must not be used after close().
+    # Seeking by time assumes timestamps do not go back, which holds for a file written by one BinaryFileHandler at a time
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._index_times: list[int] = []
+        self._index_offsets: list[int] = []
+        with open(filepath, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0: # Created but nothing written yet, an empty file cannot be mapped
+                self._mmap = None
+                self._view = memoryview(b'')
+                return
+            if size < FILE_HEADER.size:
+                raise ValueError(f'{filepath} is not a binary log of version {VERSION}: {size} bytes is shorter than the header')
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f'{filepath} is not a binary log of version {VERSION}')
+        self._view = memoryview(self._mmap)
+        self._load_index()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass # Records still point into the mapping, it is unmapped when they are gone
+
+    def __iter__(self) -> Iterator[Record]:
+        return self._records(FILE_HEADER.size)
+
+    def _records(self, offset: int) -> Iterator[Record]:
+        view, size = self._view, len(self._view)
+        while offset + RECORD_HEADER.size <= size:
+            length, timestamp_ns, level = RECORD_HEADER.unpack_from(view, offset)
+            start = offset + RECORD_HEADER.size
+            offset = start + length
+            if offset > size: # The last record is not fully written yet
+                return
+            yield Record(timestamp_ns, level, view[start:offset])
+
+    def range(self, start_ns: int, end_ns: int) -> Iterator[Record]:
+        # Records with start_ns <= timestamp <= end_ns. The index gives the last indexed record before start_ns,
+        # reading starts there instead of at the beginning of the file
+        position = bisect.bisect_left(self._index_times, start_ns) - 1
+        offset = self._index_offsets[position] if position >= 0 else FILE_HEADER.size
+        for record in self._records(offset):
+            if record.timestamp_ns > end_ns:
+                return
+            if record.timestamp_ns >= start_ns:
+                yield record
+
+    def _load_index(self) -> None:
+        path = f'{self.filepath}.idx'
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data) != (INDEX_MAGIC, VERSION):
+            print(f'Index error: {path} is not an index of version {VERSION}, reading without it')
+            return
+        entries = len(data) - FILE_HEADER.size
+        for timestamp_ns, offset in INDEX_ENTRY.iter_unpack(data[FILE_HEADER.size:FILE_HEADER.size + entries - entries % INDEX_ENTRY.size]):
+            # Entries of records that never reached the file are left out, and so are ones that would break the order
+            if offset < len(self._view) and (not self._index_times or timestamp_ns >= self._index_times[-1]):
+                self._index_times.append(timestamp_ns)
+                self._index_offsets.append(offset)
+
+    def build_index(self, index_interval: int = 1024) -> None:
+        # For logs written without an index, e.g. received from a BinarySocketHandler
+        self._index_times.clear()
+        self._index_offsets.clear()
+        offset = FILE_HEADER.size
+        with open(f'{self.filepath}.idx', 'wb') as file:
+            file.write(FILE_HEADER.pack(INDEX_MAGIC, VERSION))
+            for number, record in enumerate(self):
+                if number % index_interval == 0:
+                    file.write(INDEX_ENTRY.pack(record.timestamp_ns, offset))
+                    self._index_times.append(record.timestamp_ns)
+                    self._index_offsets.append(offset)
+                offset += RECORD_HEADER.size + len(record.payload)
+                record.payload.release()
@@ -0,0 +1,73 @@
+import threading
+from typing import Self
+from Lab3 import LogHandlerProtocol, format_line
+
+
+class BufferedFileHandler(LogHandlerProtocol):
+    # Keeps the log file open and collects lines in memory. They are written when buffer_size bytes are waiting,
+    # every flush_interval seconds (by a background thread) and on flush()/close(), Logger.close() calls the latter
+    def __init__(self, filepath: str, buffer_size: int = 64 * 1024, flush_interval: float = 1.0) -> None:
+        self.filepath = filepath
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.writes = 0
+        self._lines: list[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        try:
+            self._file = open(filepath, 'a', encoding='utf-8')
+        except Exception as e:
+            print(f'File error: {e}')
+            raise
+        self._thread = threading.Thread(target=self._run, name=f'file-handler-{filepath}', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def handle(self, message: str) -> None:
+        line = format_line(message)
+        with self._lock:
+            if self._closed.is_set():
+                print(f'File error: {self.filepath} is closed')
+                return
+            self._lines.append(line)
+            self._size += len(line)
+            if self._size >= self.buffer_size:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._write()
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self._write()
+            self._file.close()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _write(self) -> None:
+        # Called with the lock held
+        if not self._lines:
+            return
+        try:
+            self._file.write(''.join(self._lines))
+            self.writes += 1
+        except Exception as e:
+            print(f'File error: {e}')
+        self._lines.clear()
+        self._size = 0
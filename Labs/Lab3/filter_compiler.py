@@ -0,0 +1,181 @@
+from typing import Callable
+import re
+from Lab3 import LogFilterProtocol, ReLogFilter, SimpleLogFilter
+
+Test = Callable[[str, int], bool] # (message, bit mask of the substring patterns found in it) -> matches
+
+# Regexes that would change meaning inside a bigger alternation: backreferences by number or name, and inline flags
+_NOT_MERGEABLE = re.compile(r'\\\d|\(\?P=|\(\?[aiLmsux]+\)')
+# Below this many substring patterns plain 'in' checks are faster than the automaton, which is written in Python
+AUTOMATON_THRESHOLD = 32
+
+
+class AllOf(LogFilterProtocol):
+    # Matches when every filter matches, like the filter list of Logger
+    def __init__(self, filters: list[LogFilterProtocol]) -> None:
+        self.filters = filters
+
+    def match(self, message: str) -> bool:
+        return all(filter_cls.match(message) for filter_cls in self.filters)
+
+
+class AnyOf(LogFilterProtocol):
+    def __init__(self, filters: list[LogFilterProtocol]) -> None:
+        self.filters = filters
+
+    def match(self, message: str) -> bool:
+        return any(filter_cls.match(message) for filter_cls in self.filters)
+
+
+
+class AhoCorasick:
+    # Finds which of many substrings occur in a text with one pass over the text
+    def __init__(self, patterns: list[str]) -> None:
+        self.patterns = patterns
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = [0]
+        self._output = [0] # Bit mask of the patterns that end in the state, including through fail links
+        for number, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(0)
+                state = next_state
+            self._output[state] |= 1 << number
+        queue = list(self._goto[0].values())
+        for state in queue: # Their fail link is the root, so they also end the empty pattern if there is one
+            self._output[state] |= self._output[0]
+        for state in queue: # Breadth first, so the fail target of a state is always done before it
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+                queue.append(next_state)
+        self._delta = [dict(transitions) for transitions in self._goto] # goto plus the transitions resolved while scanning
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def scan(self, text: str) -> int:
+        # Bit mask of the patterns found, bit n is patterns[n]
+        delta, output = self._delta, self._output
+        state = 0
+        found = output[0] # The empty pattern is found even in an empty text
+        for char in text:
+            next_state = delta[state].get(char)
+            if next_state is None:
+                next_state = self._transition(state, char)
+            state = next_state
+            found |= output[state]
+        return found
+
+    def _transition(self, state: int, char: str) -> int:
+        # Follows the fail links once and remembers the result, so the next time it is a single lookup
+        target = state
+        while target and char not in self._goto[target]:
+            target = self._fail[target]
+        next_state = self._goto[target].get(char, 0)
+        self._delta[state][char] = next_state
+        return next_state
+
+
+
+class CompiledFilter(LogFilterProtocol):
+    # A filter tree turned into one function. All SimpleLogFilter patterns of the tree are searched for together,
+    # with one Aho-Corasick pass (or plain 'in' checks when there are only a few), the ReLogFilter regexes that are
+    # alternatives of each other become one regex. Any other filter in the tree is called as it is
+    def __init__(self, tree: LogFilterProtocol) -> None:
+        self.patterns: list[str] = []
+        self._bits: dict[str, int] = {}
+        self._direct = _count_patterns(tree) < AUTOMATON_THRESHOLD
+        self._test = self._compile(tree)
+        self.automaton = None if self._direct else AhoCorasick(self.patterns)
+
+    def match(self, message: str) -> bool:
+        return self._test(message, 0 if self.automaton is None else self.automaton.scan(message))
+
+    def _bit(self, pattern: str) -> int:
+        bit = self._bits.get(pattern)
+        if bit is None:
+            bit = self._bits[pattern] = 1 << len(self.patterns)
+            self.patterns.append(pattern)
+        return bit
+
+    def _compile(self, node: LogFilterProtocol) -> Test:
+        if isinstance(node, (AllOf, AnyOf)) and len(node.filters) == 1:
+            return self._compile(node.filters[0])
+        if isinstance(node, (AllOf, AnyOf)):
+            return self._compile_group(node.filters, isinstance(node, AllOf))
+        if isinstance(node, SimpleLogFilter):
+            if self._direct:
+                pattern = node.pattern
+                return lambda message, found: pattern in message
+            bit = self._bit(node.pattern)
+            return lambda message, found: bool(found & bit)
+        if isinstance(node, ReLogFilter):
+            search = node.regex.search
+            return lambda message, found: search(message) is not None
+        return lambda message, found: node.match(message)
+
+    def _compile_group(self, filters: list[LogFilterProtocol], every: bool) -> Test:
+        mask = 0
+        literals: list[str] = [] # Patterns checked with 'in' when there is no automaton
+        regexes: list[re.Pattern] = []
+        tests: list[Test] = []
+        for node in filters:
+            if isinstance(node, SimpleLogFilter) and self._direct:
+                literals.append(node.pattern)
+            elif isinstance(node, SimpleLogFilter):
+                mask |= self._bit(node.pattern)
+            elif isinstance(node, ReLogFilter):
+                regexes.append(node.regex)
+            else:
+                tests.append(self._compile(node))
+        searches = [regex.search for regex in regexes]
+        if not every:
+            # Alternatives: one regex that matches when any of them does. Without an automaton the substrings join it too
+            mergeable = [regex.pattern for regex in regexes if not regex.flags & ~re.UNICODE and not _NOT_MERGEABLE.search(regex.pattern)]
+            if len(mergeable) + len(literals) > 1:
+                try:
+                    merged = re.compile('|'.join([f'(?:{pattern})' for pattern in mergeable] + [re.escape(literal) for literal in literals]))
+                    searches = [merged.search] + [regex.search for regex in regexes if regex.pattern not in mergeable]
+                    literals = []
+                except re.error: # The same group name used in two of them
+                    pass
+        # Cheapest checks first: the patterns are already found, then substrings, then the regexes, then everything else
+        checks: list[Test] = []
+        if mask and every:
+            checks.append(lambda message, found: (found & mask) == mask)
+        elif mask:
+            checks.append(lambda message, found: bool(found & mask))
+        checks += [lambda message, found, literal=literal: literal in message for literal in literals]
+        checks += [lambda message, found, search=search: search(message) is not None for search in searches]
+        checks += tests
+        if len(checks) == 1:
+            return checks[0]
+        if len(checks) == 2:
+            first, second = checks
+            if every:
+                return lambda message, found: first(message, found) and second(message, found)
+            return lambda message, found: first(message, found) or second(message, found)
+        if every:
+            return lambda message, found: all(check(message, found) for check in checks)
+        return lambda message, found: any(check(message, found) for check in checks)
+
+
+def _count_patterns(node: LogFilterProtocol) -> int:
+    if isinstance(node, (AllOf, AnyOf)):
+        return sum(_count_patterns(child) for child in node.filters)
+    return isinstance(node, SimpleLogFilter)
+
+
+def compile_filters(filters: list[LogFilterProtocol]) -> list[LogFilterProtocol]:
+    # For Logger(handlers, compile_filters(filters)): the list works the same, as one compiled filter
+    return [CompiledFilter(AllOf(filters))]
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+import random, time
+from Lab3 import LogFilterProtocol, LogHandlerProtocol
+
+# These filters keep state and count every message they are asked about, so they go last in the filter list of a
+# Logger: it stops at the first filter that rejects a message, and one placed earlier would spend tokens or remember
+# duplicates of messages that are dropped anyway. CompiledFilter already calls them after the pattern checks of a group
+
+class RateLimitFilter(LogFilterProtocol):
+    # Token bucket: messages containing pattern (every message if it is None) pass at rate per second on average,
+    # with bursts of up to burst messages. Other messages are not limited
+    def __init__(self, pattern: str | None, rate: float, burst: int = 1) -> None:
+        self.pattern = pattern
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def match(self, message: str) -> bool:
+        if self.pattern is not None and self.pattern not in message:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.suppressed += 1
+        return False
+
+
+class SamplingFilter(LogFilterProtocol):
+    # Lets through a random share (probability) of the messages containing pattern, every message if it is None
+    def __init__(self, probability: float, pattern: str | None = None, seed: int | None = None) -> None:
+        self.probability = probability
+        self.pattern = pattern
+        self.suppressed = 0
+        self._random = random.Random(seed).random
+
+    def match(self, message: str) -> bool:
+        if self.pattern is not None and self.pattern not in message:
+            return True
+        if self._random() < self.probability:
+            return True
+        self.suppressed += 1
+        return False
+
+
+class DuplicateFilter(LogFilterProtocol):
+    # A message equal to one that passed less than window seconds ago is suppressed. If copies of it were suppressed,
+    # '<message> (repeated N times)' is sent to the handlers once its window has ended, by the first match() after
+    # that, or by flush() or close(): there is no timer, a quiet logger reports nothing until it writes again or closes.
+    # At most max_keys messages are remembered, the oldest is forgotten (and reported) first. Summaries go straight
+    # to the handlers, so the same handlers are usually given to the filter and to the Logger
+    def __init__(self, window: float, handlers: list[LogHandlerProtocol], max_keys: int = 10_000) -> None:
+        self.window = window
+        self.handlers = handlers
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._seen: OrderedDict[str, list] = OrderedDict() # message -> [time it passed, copies suppressed since], oldest first
+
+    def match(self, message: str) -> bool:
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._seen.get(message)
+        if entry is not None:
+            entry[1] += 1
+            self.suppressed += 1
+            return False
+        if len(self._seen) >= self.max_keys:
+            self._report(*self._seen.popitem(last=False))
+        self._seen[message] = [now, 0]
+        return True
+
+    def flush(self) -> None:
+        # Reports every message with suppressed copies now, without waiting for its window to end
+        while self._seen:
+            self._report(*self._seen.popitem(last=False))
+
+    def close(self) -> None:
+        self.flush()
+
+    def _expire(self, now: float) -> None:
+        # Entries are in the order they were added, so only the front can be expired: O(1) per message on average
+        seen = self._seen
+        while seen:
+            message, entry = next(iter(seen.items()))
+            if now - entry[0] < self.window:
+                return
+            del seen[message]
+            self._report(message, entry)
+
+    def _report(self, message: str, entry: list) -> None:
+        if entry[1]:
+            summary = f'{message} (repeated {entry[1]} times)'
+            for handler in self.handlers:
+                handler.handle(summary)
@@ -0,0 +1,163 @@
+from collections import deque
+from time import perf_counter
+import threading
+from Lab3 import LogHandlerProtocol
+
+POLICIES = ('block', 'drop_oldest', 'drop_new')
+
+
+class LogQueue:
+    # Bounded queue of (time it was put, message). When it is full, put() waits for room (block),
+    # throws the oldest message away (drop_oldest) or the new one (drop_new)
+    def __init__(self, maxsize: int = 10_000, policy: str = 'block') -> None:
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown policy {policy}, expected one of {POLICIES}')
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._items: deque[tuple[float, str]] = deque()
+        self._unfinished = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, message: str) -> bool:
+        # Returns False if the message was dropped
+        with self._condition:
+            if len(self._items) >= self.maxsize and not self._closed:
+                if self.policy == 'drop_new':
+                    self.dropped += 1
+                    return False
+                if self.policy == 'drop_oldest':
+                    self._items.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    self._condition.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+            if self._closed:
+                self.dropped += 1
+                return False
+            self._items.append((perf_counter(), message))
+            self._unfinished += 1
+            self._condition.notify_all()
+            return True
+
+    def get_batch(self, limit: int = 256) -> list[tuple[float, str]] | None:
+        # Waits for messages and takes up to limit of them. None means the queue is closed and empty
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed)
+            if not self._items:
+                return None
+            batch = [self._items.popleft() for _ in range(min(limit, len(self._items)))]
+            self._condition.notify_all()
+            return batch
+
+    def task_done(self, count: int = 1) -> None:
+        with self._condition:
+            self._unfinished -= count
+            self._condition.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        # Waits until every message put so far was taken and handled
+        with self._condition:
+            return self._condition.wait_for(lambda: self._unfinished <= 0, timeout)
+
+    def close(self) -> None:
+        # Nothing can be put any more, the messages already in the queue are still handed out
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+
+class HandlerStats:
+    __slots__ = ('calls', 'errors', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def info(self) -> dict[str, float]:
+        return {'calls': self.calls, 'errors': self.errors, 'avg_ms': self.total / self.calls * 1000 if self.calls else 0.0,
+                'max_ms': self.max * 1000}
+
+
+
+class QueueListener:
+    # Background threads that take messages from a LogQueue and pass each one to every handler.
+    # With more than one worker, messages can reach the handlers out of order
+    def __init__(self, queue: LogQueue, handlers: list[LogHandlerProtocol], workers: int = 1) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.waiting = HandlerStats() # Time messages spend in the queue
+        self.stats = [HandlerStats() for _ in handlers]
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f'queue-listener-{number}', daemon=True)
+                         for number in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self) -> None:
+        while (batch := self.queue.get_batch()) is not None:
+            for queued_at, message in batch:
+                started = perf_counter()
+                waited = started - queued_at
+                for handler, stats in zip(self.handlers, self.stats):
+                    try:
+                        handler.handle(message)
+                    except Exception as e:
+                        print(f'Handler error: {e}')
+                        stats.errors += 1
+                    finished = perf_counter()
+                    with self._lock:
+                        stats.add(finished - started)
+                    started = finished
+                with self._lock:
+                    self.waiting.add(waited)
+            self.queue.task_done(len(batch))
+
+    def stop(self) -> None:
+        # Closes the queue, waits until everything in it is handled, then closes the handlers that have close()
+        self.queue.close()
+        for thread in self._threads:
+            thread.join()
+        for handler in self.handlers:
+            close = getattr(handler, 'close', None)
+            if close is not None:
+                close()
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            result = {'queue': self.waiting.info() | {'dropped': self.queue.dropped, 'size': len(self.queue)}}
+            for number, (handler, stats) in enumerate(zip(self.handlers, self.stats)):
+                result[f'{number}: {type(handler).__name__}'] = stats.info()
+        return result
+
+
+
+class QueueHandler(LogHandlerProtocol):
+    # Puts messages into a queue instead of handling them, so Logger.write never waits for a disk or a socket.
+    # Closing it (Logger.close() does) drains the queue and stops the listener if one was given
+    def __init__(self, queue: LogQueue, listener: QueueListener | None = None) -> None:
+        self.queue = queue
+        self.listener = listener
+
+    def handle(self, message: str) -> None:
+        self.queue.put(message)
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+        else:
+            self.queue.close()
+            self.queue.join()
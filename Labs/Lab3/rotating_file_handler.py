@@ -0,0 +1,107 @@
+from datetime import datetime
+import gzip, lzma, os, queue, re, shutil, threading, time
+from buffered_file_handler import BufferedFileHandler
+
+COMPRESSORS = {'gzip': ('.gz', gzip.open), 'lzma': ('.xz', lzma.open)}
+# What follows <name>. in a segment: the time of the rotation, then the compression suffix and .tmp while it is written
+SEGMENT_SUFFIX = rf'\.\d{{8}}-\d{{6}}-\d{{6}}(?:{"|".join(re.escape(suffix) for suffix, _ in COMPRESSORS.values())})?(?:\.tmp)?'
+
+
+class RotatingFileHandler(BufferedFileHandler):
+    # BufferedFileHandler that starts a new file when the current one reaches max_bytes or is older than interval
+    # seconds. The full file is renamed to <name>.<date and time> and compressed by a background thread, then the
+    # oldest segments are deleted while there are more than backup_count of them or they take more than max_total_bytes.
+    #
+    # Nothing is lost if the process dies in the middle: the file is closed before it is renamed, a rename is atomic,
+    # and a segment is deleted only after its compressed copy is complete and renamed into place. Segments left
+    # uncompressed by a crash are compressed the next time the handler starts
+    def __init__(self, filepath: str, max_bytes: int = 10 * 1024 * 1024, interval: float | None = None,
+                 backup_count: int = 5, max_total_bytes: int | None = None, compression: str | None = 'gzip',
+                 buffer_size: int = 64 * 1024, flush_interval: float = 1.0) -> None:
+        if compression is not None and compression not in COMPRESSORS:
+            raise ValueError(f'Unknown compression {compression}, expected one of {list(COMPRESSORS)} or None')
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.compression = compression
+        self.rotations = 0
+        self._opened_at = time.time()
+        self._segments: queue.Queue[str | None] = queue.Queue()
+        self._compressor = threading.Thread(target=self._compress_segments, name=f'compressor-{filepath}', daemon=True)
+        super().__init__(filepath, buffer_size, flush_interval)
+        self._compressor.start() # Only once the file is open, a failed open leaves no thread behind
+        for segment in self.segments():
+            if segment.endswith('.tmp'):
+                os.remove(segment) # Compression interrupted by a crash, the segment itself is still there
+            elif compression is not None and not segment.endswith(tuple(suffix for suffix, _ in COMPRESSORS.values())):
+                self._segments.put(segment)
+
+    def segments(self) -> list[str]:
+        # Rotated files, oldest first. Only names the handler writes itself, retention deletes whatever is listed here
+        directory, name = os.path.split(os.path.abspath(self.filepath))
+        segment = re.compile(re.escape(name) + SEGMENT_SUFFIX)
+        return sorted(os.path.join(directory, entry) for entry in os.listdir(directory) if segment.fullmatch(entry))
+
+    def close(self) -> None:
+        super().close()
+        self._segments.put(None)
+        self._compressor.join()
+
+    def _write(self) -> None:
+        # Called with the lock held
+        if self._lines and self._should_rotate():
+            self._rotate()
+        super()._write()
+
+    def _should_rotate(self) -> bool:
+        if self.interval is not None and time.time() - self._opened_at >= self.interval:
+            return True
+        return self._file.tell() > 0 and self._file.tell() + self._size > self.max_bytes
+
+    def _rotate(self) -> None:
+        self._file.close()
+        segment = f'{self.filepath}.{datetime.now():%Y%m%d-%H%M%S-%f}'
+        try:
+            os.replace(self.filepath, segment)
+        except Exception as e:
+            print(f'File error: {e}')
+        else:
+            self.rotations += 1
+            self._segments.put(segment)
+        self._file = open(self.filepath, 'a', encoding='utf-8')
+        self._opened_at = time.time()
+
+    def _compress_segments(self) -> None:
+        while (segment := self._segments.get()) is not None:
+            if self.compression is not None:
+                try:
+                    self._compress(segment)
+                except Exception as e:
+                    print(f'Compression error: {e}')
+            self._apply_retention()
+
+    def _compress(self, segment: str) -> None:
+        if not os.path.exists(segment): # Already deleted by retention
+            return
+        suffix, open_compressed = COMPRESSORS[self.compression]
+        temporary = f'{segment}{suffix}.tmp'
+        with open(segment, 'rb') as source, open_compressed(temporary, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        with open(temporary, 'rb') as written:
+            os.fsync(written.fileno())
+        os.replace(temporary, f'{segment}{suffix}')
+        os.remove(segment)
+
+    def _apply_retention(self) -> None:
+        segments = [segment for segment in self.segments() if not segment.endswith('.tmp')]
+        sizes = {segment: os.path.getsize(segment) for segment in segments}
+        total = sum(sizes.values())
+        while segments and (len(segments) > self.backup_count or
+                            (self.max_total_bytes is not None and total > self.max_total_bytes)):
+            oldest = segments.pop(0)
+            total -= sizes[oldest]
+            try:
+                os.remove(oldest)
+            except OSError as e:
+                print(f'File error: {e}')
@@ -1,4 +1,4 @@
-import socket
+import asyncio, socket, sys
 from typing import NoReturn
 
 def run_tcp_server() -> NoReturn:
@@ -32,5 +32,118 @@ def run_udp_server() -> NoReturn:
             print(f"Received UDP from {addr}: {data.decode('utf-8')}")
 
 
+
+class Collector:
+    # Received lines are kept in memory and appended to the output file in batches: when batch_size bytes are
+    # waiting or every flush_interval seconds. The file is written in an executor, the event loop keeps serving clients.
+    # A client sending a line longer than max_line bytes is disconnected, so it cannot make the collector keep it all in memory
+    def __init__(self, output: str, batch_size: int = 256 * 1024, flush_interval: float = 0.5, echo: bool = False,
+                 max_line: int = 64 * 1024) -> None:
+        self.output = output
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.echo = echo
+        self.max_line = max_line
+        self.clients = 0
+        self.lines = 0
+        self.batches = 0
+        self.dropped = 0 # Clients disconnected for a too long line
+        self._pending: list[bytes] = []
+        self._size = 0
+        self._wakeup = asyncio.Event()
+
+    def add(self, lines: list[bytes]) -> None:
+        if self.echo:
+            for line in lines:
+                print(f"Received: {line.decode('utf-8', 'replace')}")
+        self._pending.extend(lines)
+        self._size += sum(len(line) for line in lines)
+        self.lines += len(lines)
+        if self._size >= self.batch_size:
+            self._wakeup.set()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Messages are separated by newlines, a recv can end anywhere: the unfinished last line waits for the next one
+        self.clients += 1
+        tail = b''
+        try:
+            while data := await reader.read(65536):
+                lines = (tail + data).split(b'\n')
+                tail = lines.pop()
+                if lines:
+                    self.add(lines)
+                if len(tail) > self.max_line:
+                    print(f"Line longer than {self.max_line} bytes, closing the connection")
+                    self.dropped += 1
+                    tail = b''
+                    break
+        except ConnectionError as e:
+            print(f"Connection error: {e}")
+        finally:
+            if tail:
+                self.add([tail])
+            self.clients -= 1
+            writer.close()
+
+    async def run(self) -> NoReturn:
+        loop = asyncio.get_running_loop()
+        with open(self.output, 'ab') as file:
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+                    if self._pending:
+                        await loop.run_in_executor(None, self._write, file, self._take())
+                        self.batches += 1
+            finally:
+                # Cancelled (server stopped): the lines received since the last batch are written before the file is closed
+                if self._pending:
+                    self._write(file, self._take())
+                    self.batches += 1
+
+    def _take(self) -> bytes:
+        pending, self._pending, self._size = self._pending, [], 0
+        pending.append(b'')
+        return b'\n'.join(pending)
+
+    @staticmethod
+    def _write(file, data: bytes) -> None:
+        file.write(data)
+        file.flush()
+
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, collector: Collector) -> None:
+        self.collector = collector
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        # One datagram can carry several lines, it always ends the last one
+        self.collector.add(data.rstrip(b'\n').split(b'\n'))
+
+
+async def serve_collector(output: str, host: str = 'localhost', port: int = 5140, udp: bool = True, echo: bool = False) -> NoReturn:
+    collector = Collector(output, echo=echo)
+    server = await asyncio.start_server(collector.handle_client, host, port, backlog=4096)
+    print(f"TCP collector listening on {host}:{port}, writing to {output}")
+    if udp:
+        await asyncio.get_running_loop().create_datagram_endpoint(lambda: _UdpProtocol(collector), local_addr=(host, port))
+        print(f"UDP collector listening on {host}:{port}")
+    async with server:
+        await collector.run()
+
+
+def run_collector(output: str = 'Labs/Lab3/collected.log', host: str = 'localhost', port: int = 5140, udp: bool = True) -> NoReturn:
+    # Any number of clients with persistent connections, TCP and UDP served by one event loop
+    asyncio.run(serve_collector(output, host, port, udp))
+
+
 if __name__ == "__main__":
-    run_tcp_server()
\ No newline at end of file
+    # python socket_server.py [collector [output file]]
+    if len(sys.argv) > 1 and sys.argv[1] == "collector":
+        run_collector(*sys.argv[2:3])
+    else:
+        run_tcp_server()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import random, unittest
+from Lab3 import LogFilterProtocol, ReLogFilter, SimpleLogFilter
+from filter_compiler import AUTOMATON_THRESHOLD, AhoCorasick, AllOf, AnyOf, CompiledFilter
+
+ALPHABET = 'ab '
+
+
+def _text(rng: random.Random, longest: int) -> str:
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, longest)))
+
+
+def _tree(rng: random.Random, patterns: int, depth: int = 0) -> LogFilterProtocol:
+    if depth < 2 and rng.random() < 0.5:
+        group = AllOf if rng.random() < 0.5 else AnyOf
+        return group([_tree(rng, patterns, depth + 1) for _ in range(rng.randint(1, 4))])
+    if rng.random() < 0.2:
+        return ReLogFilter(rf'{_text(rng, 2)}\s')
+    return AnyOf([SimpleLogFilter(_text(rng, 3)) for _ in range(patterns)])
+
+
+class AhoCorasickTest(unittest.TestCase):
+    def test_scan_finds_the_same_patterns_as_in(self) -> None:
+        rng = random.Random(0)
+        for _ in range(200):
+            patterns = [_text(rng, 4) for _ in range(rng.randint(1, 8))]
+            automaton = AhoCorasick(patterns)
+            for _ in range(20):
+                text = _text(rng, 12)
+                expected = sum(1 << number for number, pattern in enumerate(patterns) if pattern in text)
+                self.assertEqual(automaton.scan(text), expected, (patterns, text))
+
+    def test_empty_pattern_is_always_found(self) -> None:
+        automaton = AhoCorasick(['', 'ab'])
+        self.assertEqual(automaton.scan(''), 0b01)
+        self.assertEqual(automaton.scan('a'), 0b01)
+        self.assertEqual(automaton.scan('xab'), 0b11)
+
+
+class CompiledFilterTest(unittest.TestCase):
+    def _check(self, patterns: int) -> None:
+        # Differential test: the compiled filter must answer like the tree it was compiled from
+        rng = random.Random(patterns)
+        for _ in range(100):
+            tree = _tree(rng, patterns)
+            compiled = CompiledFilter(tree)
+            for _ in range(20):
+                message = _text(rng, 12)
+                self.assertEqual(compiled.match(message), tree.match(message), message)
+
+    def test_direct_checks_match_the_tree(self) -> None:
+        self._check(2)
+
+    def test_automaton_matches_the_tree(self) -> None:
+        self._check(AUTOMATON_THRESHOLD)
+
+    def test_empty_pattern_matches_everything(self) -> None:
+        tree = AllOf([SimpleLogFilter('')] + [SimpleLogFilter(f'p{number}') for number in range(AUTOMATON_THRESHOLD)])
+        compiled = CompiledFilter(tree)
+        self.assertIsNotNone(compiled.automaton)
+        message = ' '.join(f'p{number}' for number in range(AUTOMATON_THRESHOLD))
+        self.assertTrue(compiled.match(message))
+        self.assertTrue(CompiledFilter(AnyOf([SimpleLogFilter(''), SimpleLogFilter('x')] * AUTOMATON_THRESHOLD)).match(''))
+
+
+if __name__ == '__main__':
+    unittest.main()